@@ -1,11 +1,15 @@
-import smtplib
-from email.message import EmailMessage
-
 from configuration import botAlert, mailConfig
+from logger_config import get_logger
+
+logger = get_logger()
 
 
 class Mail:
     def send(self, subject, message):
+        # only needed when alerts go out by email, keep them off the startup path
+        import smtplib
+        from email.message import EmailMessage
+
         msg = EmailMessage()
         msg.set_content(message)
 
@@ -25,9 +29,6 @@ class Mail:
 
 def alert(asset, message, isError=False):
     if botAlert == "email":
-        msg = EmailMessage()
-        msg.set_content(message)
-
         if isError:
             subj = "OPI Error"
         else:
@@ -36,19 +37,25 @@ def alert(asset, message, isError=False):
         if asset:
             subj = subj + ", Asset: " + asset
 
-        mail = Mail()
-        mail.send(subj, message)
-
-        if isError:
-            exit(1)
+        try:
+            Mail().send(subj, message)
+        except Exception:
+            # a mail server hiccup must not take the bot down, or keep an
+            # error alert from exiting, print the alert instead
+            logger.exception("Sending the alert via email failed")
+            print_alert(asset, message)
     else:
-        if asset:
-            print("Asset: " + asset)
+        print_alert(asset, message)
 
-        print(message)
+    if isError:
+        exit(1)
 
-        if isError:
-            exit(1)
+
+def print_alert(asset, message):
+    if asset:
+        print("Asset: " + asset)
+
+    print(message)
 
 
 def botFailed(asset, message):
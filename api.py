@@ -2,29 +2,95 @@ import datetime
 import json
 import math
 import os
+import random
+import threading
 import time
-from statistics import median
+from collections import OrderedDict
 from operator import itemgetter
 
 
+import httpx
 import pytz
-import schwab
 from schwab import auth
-from schwab.orders.options import OptionSymbol
+from schwab.orders.common import (
+    ComplexOrderStrategyType,
+    Duration,
+    OptionInstruction,
+    OrderStrategyType,
+    OrderType,
+    Session,
+    SpecialInstruction,
+)
+from schwab.orders.generic import OrderBuilder
+from schwab.orders.options import OptionSymbol, option_sell_to_open_limit
 from schwab.utils import Utils
 
 import alert
-from cc import round_to_nearest_five_cents
+from cc import price_ladder
 from configuration import SchwabAccountID, debugCanSendOrders
 from logger_config import get_logger
+from streaming import AccountActivityStream
 from support import extract_date, extract_strike_price, validDateFormat
 from authlib.integrations.base_client.errors import OAuthError
 
 logger = get_logger()
 
+MARKET_TIMEZONE = pytz.timezone("America/New_York")
+
+# an order in one of these states can't change anymore
+TERMINAL_ORDER_STATUSES = frozenset(
+    ["FILLED", "CANCELED", "REJECTED", "EXPIRED", "REPLACED"]
+)
+
+
+class TTLCache:
+    """
+    Values reused for expiry seconds after they were stored, shared between threads
+    Expired entries are dropped whenever a new one is stored, so they don't pile up
+    """
+
+    def __init__(self, expiry):
+        self.expiry = expiry
+        self.entries = {}
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            cached = self.entries.get(key)
+        if cached is not None and time.monotonic() - cached[0] < self.expiry:
+            return cached[1]
+        return None
+
+    def put(self, key, value):
+        now = time.monotonic()
+        with self.lock:
+            self.entries = {
+                k: v for k, v in self.entries.items() if now - v[0] < self.expiry
+            }
+            self.entries[key] = (now, value)
+
 
 class Api:
     connectClient = None
+    accountHash = None
+    orderUtils = None
+    orderActivity = None
+    # (market date, market hours response) of the last hours we fetched
+    marketHours = None
+    # seconds a checked order is reused while the activity stream is running
+    orderCacheExpiry = 5
+    # most orders kept in orderCache and terminalOrders, oldest dropped first
+    orderCacheSize = 1024
+    terminalOrdersSize = 8192
+    # seconds a fetched option chain is reused for the same request
+    chainCacheExpiry = 10
+    # seconds a fetched quote (ATM price, option details) is reused for a symbol
+    priceCacheExpiry = 5
+    # seconds before the first check of a (re)priced order, doubled up to the
+    # check interval, most fills happen right away or not for a while
+    firstOrderCheck = 0.5
+    # spread the checks of orders watched side by side, as a fraction of the delay
+    orderCheckJitter = 0.2
     tokenPath = ""
     apiKey = ""
     apiRedirectUri = ""
@@ -36,8 +102,33 @@ class Api:
         self.apiKey = apiKey
         self.apiRedirectUri = apiRedirectUri
         self.appSecret = appSecret
+        # orderId -> (monotonic time it was checked, checked order)
+        self.orderCache = OrderedDict()
+        # held for every change to orderCache, the activity stream clears it
+        # from its own thread
+        self.orderCacheLock = threading.Lock()
+        # orderId -> checked order that reached a terminal status
+        self.terminalOrders = OrderedDict()
+        # orderId -> order spec it was sent with, reused to reprice it
+        self.sentOrders = {}
+        # (asset, contract type, strikes, from, to) -> chain, find_spreads
+        # fetches chains from several threads at once
+        self.chainCache = TTLCache(self.chainCacheExpiry)
+        # symbol -> ATM price
+        self.priceCache = TTLCache(self.priceCacheExpiry)
+        # option symbol -> option details
+        self.detailsCache = TTLCache(self.priceCacheExpiry)
 
     def setup(self):
+        # main calls this on every pass, keep the client so its pooled
+        # keep-alive connections survive; dropStaleClient lets the next pass
+        # log in again once a call fails on the login
+        if self.connectClient is not None:
+            return
+
+        # a new client may belong to a different login, so fetch the hash again
+        self.accountHash = None
+        self.orderUtils = None
         try:
             self.connectClient = auth.client_from_token_file(
                 api_key=self.apiKey,
@@ -57,6 +148,44 @@ class Api:
                 token_path=self.tokenPath,
             )
 
+        if self.orderActivity is None:
+            self.orderActivity = AccountActivityStream(
+                self.connectClient, on_activity=self.clearOrderCache
+            )
+            self.orderActivity.start()
+        else:
+            # the stream logs in again with whatever client it holds, one that
+            # went stale would keep it failing to reconnect forever
+            self.orderActivity.set_client(self.connectClient)
+
+    def dropStaleClient(self, e):
+        """
+        Drop the client if the error e came from its login going stale,
+        so the next setup() logs in again; returns whether it was dropped
+        """
+        if isinstance(e, OAuthError) or (
+            isinstance(e, httpx.HTTPStatusError) and e.response.status_code == 401
+        ):
+            self.connectClient = None
+            return True
+
+        return False
+
+    def waitForOrderActivity(self, timeout):
+        """
+        Wait up to timeout seconds for the next order check,
+        returns early when the account activity stream reports something
+        """
+        if self.orderActivity is None:
+            time.sleep(timeout)
+            return False
+
+        return self.orderActivity.wait(timeout)
+
+    def clearOrderCache(self):
+        with self.orderCacheLock:
+            self.orderCache.clear()
+
     def get_hash_value(self, account_number, data):
         for item in data:
             if item["accountNumber"] == account_number:
@@ -64,17 +193,29 @@ class Api:
         return None
 
     def getAccountHash(self):
+        # the hash never changes for a given account, so only ask the api once
+        if self.accountHash is not None:
+            return self.accountHash
+
         r = self.connectClient.get_account_numbers()
 
         assert r.status_code == 200, r.raise_for_status()
 
         data = r.json()
         try:
-            return self.get_hash_value(SchwabAccountID, data)
+            self.accountHash = self.get_hash_value(SchwabAccountID, data)
         except KeyError:
             return alert.botFailed(None, "Error while getting account hash value")
 
+        return self.accountHash
+
     def getATMPrice(self, asset):
+        # rolling several shorts of one underlying asks for its price once per
+        # short, a price fetched moments ago is still good
+        cached = self.priceCache.get(asset)
+        if cached is not None:
+            return cached
+
         # client can be None
         r = self.connectClient.get_quote(asset)
 
@@ -85,49 +226,55 @@ class Api:
 
         try:
             if data[asset]["assetMainType"] == "OPTION":
-                lastPrice = median(
-                    [data[asset]["quote"]["bidPrice"], data[asset]["quote"]["askPrice"]]
-                )
+                quote = data[asset]["quote"]
+                lastPrice = (quote["bidPrice"] + quote["askPrice"]) / 2
             else:
                 lastPrice = data[asset]["quote"]["lastPrice"]
         except KeyError:
             return alert.botFailed(asset, "Wrong data from api when getting ATM price")
 
+        self.priceCache.put(asset, lastPrice)
+
         return lastPrice
 
     def getOptionChain(self, asset, strikes, date, daysLessAllowed):
-        fromDate = date - datetime.timedelta(days=daysLessAllowed)
-        toDate = date
-
-        r = self.connectClient.get_option_chain(
+        return self.fetchOptionChain(
             asset,
-            contract_type=self.connectClient.Options.ContractType.CALL,
-            strike_count=strikes,
-            strategy=self.connectClient.Options.Strategy.SINGLE,
-            interval=None,
-            strike=None,
-            strike_range=None,
-            from_date=fromDate,
-            to_date=toDate,
-            volatility=None,
-            underlying_price=None,
-            interest_rate=None,
-            days_to_expiration=None,
-            exp_month=None,
-            option_type=None,
+            self.connectClient.Options.ContractType.CALL,
+            strikes,
+            date,
+            daysLessAllowed,
         )
 
-        assert r.status_code == 200, r.raise_for_status()
-
-        return r.json()
-
     def getPutOptionChain(self, asset, strikes, date, daysLessAllowed):
+        return self.fetchOptionChain(
+            asset,
+            self.connectClient.Options.ContractType.PUT,
+            strikes,
+            date,
+            daysLessAllowed,
+        )
+
+    def fetchOptionChain(self, asset, contractType, strikes, date, daysLessAllowed):
         fromDate = date - datetime.timedelta(days=daysLessAllowed)
         toDate = date
 
+        # the api only looks at the dates, so the same chain asked for again
+        # moments later (like for several shorts of one asset) is reused
+        key = (
+            asset,
+            contractType,
+            strikes,
+            fromDate.strftime("%Y-%m-%d"),
+            toDate.strftime("%Y-%m-%d"),
+        )
+        cached = self.chainCache.get(key)
+        if cached is not None:
+            return cached
+
         r = self.connectClient.get_option_chain(
             asset,
-            contract_type=self.connectClient.Options.ContractType.PUT,
+            contract_type=contractType,
             strike_count=strikes,
             strategy=self.connectClient.Options.Strategy.SINGLE,
             interval=None,
@@ -145,10 +292,17 @@ class Api:
 
         assert r.status_code == 200, r.raise_for_status()
 
-        return r.json()
+        chain = r.json()
+        self.chainCache.put(key, chain)
 
-    def getOptionExecutionWindow(self):
-        now = datetime.datetime.now(pytz.UTC)
+        return chain
+
+    def getMarketHours(self, now):
+        # the hours only change from one trading day to the next, and the main
+        # loop asks for them on every pass
+        today = now.astimezone(MARKET_TIMEZONE).date()
+        if self.marketHours is not None and self.marketHours[0] == today:
+            return self.marketHours[1]
 
         r = self.connectClient.get_market_hours(
             self.connectClient.MarketHours.Market.OPTION
@@ -157,14 +311,20 @@ class Api:
         assert r.status_code == 200, r.raise_for_status()
 
         data = r.json()
+        self.marketHours = (today, data)
+
+        return data
+
+    def getOptionExecutionWindow(self):
+        now = datetime.datetime.now(pytz.UTC)
+
+        data = self.getMarketHours(now)
 
         try:
             marketKey = list(data["option"].keys())[0]
             if not data.get("option")[marketKey].get("isOpen"):
                 return {"open": False, "openDate": None, "nowDate": now}
 
-            marketKey = list(data["option"].keys())[0]
-
             sessionHours = data["option"][marketKey]["sessionHours"]
 
             if sessionHours is None:
@@ -211,17 +371,13 @@ class Api:
 
             # init a new position, sell to open
             order = (
-                schwab.orders.options.option_sell_to_open_limit(
-                    newSymbol, newAmount, price
-                )
-                .set_duration(schwab.orders.common.Duration.DAY)
-                .set_session(schwab.orders.common.Session.NORMAL)
+                option_sell_to_open_limit(newSymbol, newAmount, price)
+                .set_duration(Duration.DAY)
+                .set_session(Session.NORMAL)
             )
 
             if newAmount > 1:
-                order.set_special_instruction(
-                    schwab.orders.common.SpecialInstruction.ALL_OR_NONE
-                )
+                order.set_special_instruction(SpecialInstruction.ALL_OR_NONE)
         else:
             # roll
 
@@ -242,32 +398,27 @@ class Api:
                     # reduce the price by 1% for each retry
                     price = round(price * (fullPricePercentage / 100), 2)
 
-            order = schwab.orders.generic.OrderBuilder()
-
-            orderType = schwab.orders.common.OrderType.NET_CREDIT
+            orderType = OrderType.NET_CREDIT
 
             if price < 0:
                 price = -price
-                orderType = schwab.orders.common.OrderType.NET_DEBIT
-
-            order.add_option_leg(
-                schwab.orders.common.OptionInstruction.BUY_TO_CLOSE,
-                oldSymbol,
-                oldAmount,
-            ).add_option_leg(
-                schwab.orders.common.OptionInstruction.SELL_TO_OPEN,
-                newSymbol,
-                newAmount,
-            ).set_duration(
-                schwab.orders.common.Duration.DAY
-            ).set_session(
-                schwab.orders.common.Session.NORMAL
-            ).set_price(
-                price
-            ).set_order_type(
-                orderType
-            ).set_order_strategy_type(
-                schwab.orders.common.OrderStrategyType.SINGLE
+                orderType = OrderType.NET_DEBIT
+
+            order = self.buildMultiLegOrder(
+                [
+                    (
+                        OptionInstruction.BUY_TO_CLOSE,
+                        oldSymbol,
+                        oldAmount,
+                    ),
+                    (
+                        OptionInstruction.SELL_TO_OPEN,
+                        newSymbol,
+                        newAmount,
+                    ),
+                ],
+                price,
+                orderType,
             )
 
         if not debugCanSendOrders:
@@ -277,23 +428,123 @@ class Api:
         r = self.connectClient.place_order(SchwabAccountID, order)
 
         order_id = Utils(self.connectClient, SchwabAccountID).extract_order_id(r)
-        assert order_id is not None
+        if order_id is None:
+            raise RuntimeError("place_order returned no order id")
 
         return order_id
 
+    def buildMultiLegOrder(self, legs, price, orderType, complexOrderStrategyType=None):
+        """
+        Build a single day order out of (instruction, symbol, amount) legs
+        """
+        order = OrderBuilder()
+
+        for instruction, symbol, amount in legs:
+            order.add_option_leg(instruction, symbol, amount)
+
+        order.set_duration(Duration.DAY)
+        order.set_session(Session.NORMAL)
+        order.set_price(price)
+        order.set_order_type(orderType)
+        order.set_order_strategy_type(OrderStrategyType.SINGLE)
+
+        if complexOrderStrategyType is not None:
+            order.set_complex_order_strategy_type(complexOrderStrategyType)
+
+        return order
+
+    def sendOrder(self, order, replaceOrderId=None):
+        """
+        Place a new order, or replace the working order replaceOrderId with it
+        Replacing changes a working order in one call instead of a cancel and a new order
+        """
+        if replaceOrderId is None:
+            return self.connectClient.place_order(self.getAccountHash(), order)
+
+        return self.connectClient.replace_order(
+            self.getAccountHash(), replaceOrderId, order
+        )
+
+    def extractOrderId(self, r):
+        # Utils is bound to the client and account, build it once per client
+        if self.orderUtils is None:
+            self.orderUtils = Utils(self.connectClient, self.getAccountHash())
+
+        order_id = self.orderUtils.extract_order_id(r)
+        if order_id is None:
+            raise RuntimeError("place_order returned no order id")
+
+        return order_id
+
+    def submitOrder(self, order, errorMessage, replaceOrderId=None):
+        if not debugCanSendOrders:
+            print("Order not placed: ", order.build())
+            exit()
+        try:
+            r = self.sendOrder(order, replaceOrderId)
+        except Exception as e:
+            print(e)
+            return alert.botFailed(None, errorMessage)
+
+        order_id = self.extractOrderId(r)
+        self.sentOrders[order_id] = order
+
+        return order_id
+
+    def editOrderPrice(self, orderId, price):
+        """
+        Replace a working order with the same legs at a new price
+        The spec we sent is reused, so the legs are not rebuilt or fetched back
+        """
+        order = self.sentOrders.pop(orderId, None)
+        if order is None:
+            # finished, cancelled, or sent before a restart; nothing to reprice
+            return alert.botFailed(
+                None, f"Can't reprice order {orderId}, it wasn't sent from here"
+            )
+        # the replaced order is about to change state, drop what we know about it
+        with self.orderCacheLock:
+            self.orderCache.pop(orderId, None)
+        # the order type carries the debit/credit side, the price is always positive
+        order.set_price(str(abs(price)))
+
+        return self.submitOrder(order, "Error while replacing the order", orderId)
+
     def checkOrder(self, orderId):
+        # a finished order never changes again, no need to ask twice
+        checkedOrder = self.terminalOrders.get(orderId)
+        if checkedOrder is not None:
+            self.terminalOrders.move_to_end(orderId)
+            return checkedOrder
+
+        with self.orderCacheLock:
+            cached = self.orderCache.get(orderId)
+        if cached is not None:
+            checkedTime, checkedOrder = cached
+            # the activity stream clears the cache on any account change,
+            # so while it runs a recent answer is still the current one
+            if (
+                self.orderActivity is not None
+                and self.orderActivity.running
+                and time.monotonic() - checkedTime < self.orderCacheExpiry
+            ):
+                return checkedOrder
+
+        return self.fetchOrder(orderId)
+
+    def fetchOrder(self, orderId):
         r = self.connectClient.get_order(orderId, self.getAccountHash())
 
         assert r.status_code == 200, r.raise_for_status()
 
         data = r.json()
-        if data["status"] == "FILLED":
-            print(f"Check Order details: {data}")
         complexOrderStrategyType = None
 
         try:
             status = data["status"]
-            filled = data["status"] == "FILLED"
+            filled = status == "FILLED"
+            if filled:
+                print(f"Check Order details: {data}")
             price = data["price"]
             partialFills = data["filledQuantity"]
             orderType = "CREDIT"
@@ -309,7 +560,7 @@ class Api:
         except KeyError:
             return alert.botFailed(None, "Error while checking working order")
 
-        return {
+        checkedOrder = {
             "status": status,
             "filled": filled,
             "price": price,
@@ -318,9 +569,30 @@ class Api:
             "typeAdjustedPrice": typeAdjustedPrice,
             "orderType": orderType,
         }
+        if status in TERMINAL_ORDER_STATUSES:
+            # kept apart so activity on other orders doesn't evict it
+            self.terminalOrders[orderId] = checkedOrder
+            if len(self.terminalOrders) > self.terminalOrdersSize:
+                self.terminalOrders.popitem(last=False)
+            with self.orderCacheLock:
+                self.orderCache.pop(orderId, None)
+            # it won't be repriced anymore
+            self.sentOrders.pop(orderId, None)
+        else:
+            with self.orderCacheLock:
+                # stored again at the end, so the oldest checked orders go first
+                self.orderCache.pop(orderId, None)
+                self.orderCache[orderId] = (time.monotonic(), checkedOrder)
+                if len(self.orderCache) > self.orderCacheSize:
+                    self.orderCache.popitem(last=False)
+
+        return checkedOrder
 
     def cancelOrder(self, orderId):
         r = self.connectClient.cancel_order(orderId, self.getAccountHash())
+        with self.orderCacheLock:
+            self.orderCache.pop(orderId, None)
+        self.sentOrders.pop(orderId, None)
 
         # throws error if cant cancel (code 400 - 404)
         assert r.status_code == 200, r.raise_for_status()
@@ -413,11 +685,21 @@ class Api:
             return False
 
     def get_quote(self, asset):
-        r = self.connectClient.get_quotes([asset])
+        return self.get_quotes([asset])
+
+    def get_quotes(self, assets):
+        # one request for any number of symbols
+        r = self.connectClient.get_quotes(assets)
         assert r.status_code == 200 or r.status_code == 201, r.raise_for_status()
         return r.json()
 
     def getOptionDetails(self, asset):
+        # checking coverage asks for every short in the account again, details
+        # fetched moments ago are still good
+        cached = self.detailsCache.get(asset)
+        if cached is not None:
+            return cached
+
         r = self.connectClient.get_quotes(asset)
 
         assert r.status_code == 200, r.raise_for_status()
@@ -425,18 +707,22 @@ class Api:
         data = r.json()
 
         try:
-            year = str(data[asset]["reference"]["expirationYear"])
-            month = str(data[asset]["reference"]["expirationMonth"]).zfill(2)
-            day = str(data[asset]["reference"]["expirationDay"]).zfill(2)
-            expiration = year + "-" + month + "-" + day
+            reference = data[asset]["reference"]
+            expiration = "-".join(
+                [
+                    str(reference["expirationYear"]),
+                    str(reference["expirationMonth"]).zfill(2),
+                    str(reference["expirationDay"]).zfill(2),
+                ]
+            )
 
             if not validDateFormat(expiration):
                 return alert.botFailed(
                     asset, "Incorrect date format from api: " + expiration
                 )
 
-            return {
-                "strike": data[asset]["reference"]["strikePrice"],
+            details = {
+                "strike": reference["strikePrice"],
                 "expiration": expiration,
                 "delta": data[asset]["quote"]["delta"],
             }
@@ -445,12 +731,17 @@ class Api:
                 asset, "Wrong data from api when getting option expiry data"
             )
 
+        self.detailsCache.put(asset, details)
+
+        return details
+
     def updateShortPosition(self):
         # get account positions
         r = self.connectClient.get_account(
             self.getAccountHash(), fields=self.connectClient.Account.Fields.POSITIONS
         )
-        return self.optionPositions(r.text)
+        # json.loads takes the raw bytes, no need to decode the body to str first
+        return self.optionPositions(r.content)
 
     def optionPositions(self, data):
         data = json.loads(data)
@@ -458,73 +749,63 @@ class Api:
         logger.debug("Positions: %s", positions)
         shortPositions = []
         for position in positions:
+            instrument = position["instrument"]
             if (
-                position["instrument"]["assetType"] != "OPTION"
-                and position["instrument"].get("putCall") != "CALL"
+                instrument["assetType"] != "OPTION"
+                and instrument.get("putCall") != "CALL"
                 and position["shortQuantity"] == 0
             ):
                 continue
+            description = instrument["description"]
             entry = {
-                "stockSymbol": position["instrument"].get("underlyingSymbol"),
-                "optionSymbol": position["instrument"]["symbol"],
-                "expiration": extract_date(position["instrument"]["description"]),
+                "stockSymbol": instrument.get("underlyingSymbol"),
+                "optionSymbol": instrument["symbol"],
+                "expiration": extract_date(description),
                 "count": position["shortQuantity"],
-                "strike": extract_strike_price(position["instrument"]["description"]),
+                "strike": extract_strike_price(description),
                 "receivedPremium": position["averagePrice"],
             }
             shortPositions.append(entry)
-        shortPositions = sorted(shortPositions, key=itemgetter("expiration"))
+        shortPositions.sort(key=itemgetter("expiration"))
         return shortPositions
 
     def rollOver(self, oldSymbol, newSymbol, amount, price):
         # init a new position, sell to open,
         # price is the net amount to be credited (received) for the roll
-        order = schwab.orders.generic.OrderBuilder()
-
-        orderType = schwab.orders.common.OrderType.NET_CREDIT
+        orderType = OrderType.NET_CREDIT
 
         if price < 0:
             price = -price
-            orderType = schwab.orders.common.OrderType.NET_DEBIT
-
-        order.add_option_leg(
-            schwab.orders.common.OptionInstruction.BUY_TO_CLOSE,
-            oldSymbol,
-            amount,
-        ).add_option_leg(
-            schwab.orders.common.OptionInstruction.SELL_TO_OPEN,
-            newSymbol,
-            amount,
-        ).set_duration(
-            schwab.orders.common.Duration.DAY
-        ).set_session(
-            schwab.orders.common.Session.NORMAL
-        ).set_price(
-            str(price)
-        ).set_order_type(
-            orderType
-        ).set_order_strategy_type(
-            schwab.orders.common.OrderStrategyType.SINGLE
-        ).set_complex_order_strategy_type(
-            schwab.orders.common.ComplexOrderStrategyType.DIAGONAL
+            orderType = OrderType.NET_DEBIT
+
+        order = self.buildMultiLegOrder(
+            [
+                (
+                    OptionInstruction.BUY_TO_CLOSE,
+                    oldSymbol,
+                    amount,
+                ),
+                (
+                    OptionInstruction.SELL_TO_OPEN,
+                    newSymbol,
+                    amount,
+                ),
+            ],
+            str(price),
+            orderType,
+            ComplexOrderStrategyType.DIAGONAL,
         )
 
-        if not debugCanSendOrders:
-            print("Order not placed: ", order.build())
-            exit()
-        try:
-            r = self.connectClient.place_order(self.getAccountHash(), order)
-        except Exception as e:
-            print(e)
-            return alert.botFailed(None, "Error while placing the roll order")
-
-        order_id = Utils(self.connectClient, self.getAccountHash()).extract_order_id(r)
-        assert order_id is not None
-
-        return order_id
+        return self.submitOrder(order, "Error while placing the roll order")
 
     def vertical_call_order(
-        self, symbol, expiration, strike_low, strike_high, amount, price
+        self,
+        symbol,
+        expiration,
+        strike_low,
+        strike_high,
+        amount,
+        price,
     ):
 
         if "$" in symbol:
@@ -533,49 +814,34 @@ class Api:
         long_call_sym = OptionSymbol(symbol, expiration, "C", str(strike_low)).build()
         short_call_sym = OptionSymbol(symbol, expiration, "C", str(strike_high)).build()
 
-        order = schwab.orders.generic.OrderBuilder()
-
-        orderType = schwab.orders.common.OrderType.NET_DEBIT
-
-        order.add_option_leg(
-            schwab.orders.common.OptionInstruction.BUY_TO_OPEN,
-            long_call_sym,
-            amount,
-        ).add_option_leg(
-            schwab.orders.common.OptionInstruction.SELL_TO_OPEN,
-            short_call_sym,
-            amount,
-        ).set_duration(
-            schwab.orders.common.Duration.DAY
-        ).set_session(
-            schwab.orders.common.Session.NORMAL
-        ).set_price(
-            str(price)
-        ).set_order_type(
-            orderType
-        ).set_order_strategy_type(
-            schwab.orders.common.OrderStrategyType.SINGLE
-        ).set_complex_order_strategy_type(
-            schwab.orders.common.ComplexOrderStrategyType.VERTICAL
+        order = self.buildMultiLegOrder(
+            [
+                (
+                    OptionInstruction.BUY_TO_OPEN,
+                    long_call_sym,
+                    amount,
+                ),
+                (
+                    OptionInstruction.SELL_TO_OPEN,
+                    short_call_sym,
+                    amount,
+                ),
+            ],
+            str(price),
+            OrderType.NET_DEBIT,
+            ComplexOrderStrategyType.VERTICAL,
         )
 
-        if not debugCanSendOrders:
-            print("Order not placed: ", order.build())
-            exit()
-        hash = self.getAccountHash()
-        try:
-            r = self.connectClient.place_order(hash, order)
-        except Exception as e:
-            print(e)
-            return alert.botFailed(None, "Error while placing the vertical call order")
-
-        order_id = Utils(self.connectClient, hash).extract_order_id(r)
-        assert order_id is not None
-
-        return order_id
+        return self.submitOrder(order, "Error while placing the vertical call order")
 
     def synthetic_covered_call_order(
-        self, symbol, expiration, strike_low, strike_high, amount, price
+        self,
+        symbol,
+        expiration,
+        strike_low,
+        strike_high,
+        amount,
+        price,
     ):
 
         if "$" in symbol:
@@ -585,73 +851,87 @@ class Api:
         short_put_sym = OptionSymbol(symbol, expiration, "P", str(strike_low)).build()
         short_call_sym = OptionSymbol(symbol, expiration, "C", str(strike_high)).build()
 
-        order = schwab.orders.generic.OrderBuilder()
-
-        orderType = schwab.orders.common.OrderType.NET_DEBIT
-
-        order.add_option_leg(
-            schwab.orders.common.OptionInstruction.BUY_TO_OPEN,
-            long_call_sym,
-            amount,
-        ).add_option_leg(
-            schwab.orders.common.OptionInstruction.SELL_TO_OPEN,
-            short_call_sym,
-            amount,
-        ).add_option_leg(
-            schwab.orders.common.OptionInstruction.SELL_TO_OPEN,
-            short_put_sym,
-            amount,
-        ).set_duration(
-            schwab.orders.common.Duration.DAY
-        ).set_session(
-            schwab.orders.common.Session.NORMAL
-        ).set_price(
-            str(price)
-        ).set_order_type(
-            orderType
-        ).set_order_strategy_type(
-            schwab.orders.common.OrderStrategyType.SINGLE
-        ).set_complex_order_strategy_type(
-            schwab.orders.common.ComplexOrderStrategyType.VERTICAL
+        order = self.buildMultiLegOrder(
+            [
+                (
+                    OptionInstruction.BUY_TO_OPEN,
+                    long_call_sym,
+                    amount,
+                ),
+                (
+                    OptionInstruction.SELL_TO_OPEN,
+                    short_call_sym,
+                    amount,
+                ),
+                (
+                    OptionInstruction.SELL_TO_OPEN,
+                    short_put_sym,
+                    amount,
+                ),
+            ],
+            str(price),
+            OrderType.NET_DEBIT,
+            ComplexOrderStrategyType.VERTICAL,
         )
 
-        if not debugCanSendOrders:
-            print("Order not placed: ", order.build())
-            exit()
-        hash = self.getAccountHash()
-        try:
-            r = self.connectClient.place_order(hash, order)
-        except Exception as e:
-            print(e)
-            return alert.botFailed(None, "Error while placing the vertical call order")
-
-        order_id = Utils(self.connectClient, hash).extract_order_id(r)
-        assert order_id is not None
+        return self.submitOrder(order, "Error while placing the vertical call order")
 
-        return order_id
+    def monitorOrder(
+        self, orderId, price, checkInterval, maxRetries=75, checkFillXTimes=12
+    ):
+        """
+        Wait for an order to fill, repricing it 1% lower every checkFillXTimes checks
+        checkInterval is the seconds between checks, or a function returning them
+        """
+        intervalOf = checkInterval if callable(checkInterval) else lambda: checkInterval
+
+        # bind the hot lookups once, the loops below run up to 900 times
+        checkOrder = self.checkOrder
+        waitForOrderActivity = self.waitForOrderActivity
+
+        for rounded_price in price_ladder(price, maxRetries):
+            # activity on other orders wakes the wait early, so give each price
+            # a time window rather than a number of wake-ups; the window follows
+            # the current interval so it shrinks when the interval does
+            stepStart = time.monotonic()
+            delay = self.firstOrderCheck
+            status = None
+            while True:
+                interval = intervalOf()
+                remaining = stepStart + checkFillXTimes * interval - time.monotonic()
+                if remaining <= 0:
+                    break
+                print("Waiting for order to be filled ...")
+                wait = delay * random.uniform(
+                    1 - self.orderCheckJitter, 1 + self.orderCheckJitter
+                )
+                waitForOrderActivity(min(wait, interval, remaining))
+                delay *= 2
+                checkedOrder = checkOrder(orderId)
+                if status is not None and checkedOrder["status"] != status:
+                    # the order is moving (queued to working, ...), look again
+                    # soon instead of backing off further
+                    delay = self.firstOrderCheck
+                status = checkedOrder["status"]
+                if checkedOrder["filled"]:
+                    print(f"Order filled: {orderId}\n Order details: {checkedOrder}")
+                    return
+                if status in TERMINAL_ORDER_STATUSES:
+                    # canceled, rejected, expired or replaced elsewhere, it
+                    # can't fill or be repriced anymore
+                    alert.alert(
+                        None,
+                        f"Order {status.lower()}: {orderId}\n Order details: {checkedOrder}",
+                    )
+                    return
+            print("Can't fill order, retrying with lower price ...")
+            # replace the working order in place instead of cancelling it first
+            orderId = self.editOrderPrice(orderId, rounded_price)
 
     def place_order(api, order_func, order_params, price=None):
-        maxRetries = 75
-        checkFillXTimes = 12
-
         # Ensure that price is not included in order_params
         order_params = [param for param in order_params if param != price]
 
         order_id = order_func(*order_params, price=price)
 
-        for retry in range(maxRetries):
-            for x in range(checkFillXTimes):
-                print("Waiting for order to be filled ...")
-                time.sleep(60)
-                checkedOrder = api.checkOrder(order_id)
-                if checkedOrder["status"] == "CANCELED":
-                    print(f"Order canceled: {order_id}\n Order details: {checkedOrder}")
-                    return
-                if checkedOrder["filled"]:
-                    print(f"Order filled: {order_id}\n Order details: {checkedOrder}")
-                    return
-            api.cancelOrder(order_id)
-            print("Can't fill order, retrying with lower price ...")
-            new_price = price * (100 - retry) / 100
-            rounded_price = round_to_nearest_five_cents(new_price)
-            order_id = order_func(*order_params, rounded_price)
+        api.monitorOrder(order_id, price, checkInterval=60)
@@ -1,6 +1,4 @@
 import math
-import statistics
-import time
 from datetime import datetime, timedelta
 from datetime import time as time_module
 
@@ -12,6 +10,7 @@ import alert
 from configuration import configuration
 from logger_config import get_logger
 from optionChain import OptionChain
+from support import parse_date
 
 logger = get_logger()
 
@@ -20,16 +19,22 @@ class Cc:
     def __init__(self, asset):
         self.asset = asset
 
-    def find_new_contract(self, api, existing):
-        # check if asset is in configuration
+    def get_chain(self, api):
         if self.asset not in configuration:
-            print(f"Configuration for {self.asset} not found")
             return None
         days = configuration[self.asset]["maxRollOutWindow"]
         toDate = datetime.today() + timedelta(days=days)
         option_chain = OptionChain(api, self.asset, toDate, days)
-        chain = option_chain.get()
-        roll = find_best_rollover(api, chain, existing)
+        return option_chain.get()
+
+    def find_new_contract(self, api, existing, chain=None, contracts=None):
+        # check if asset is in configuration
+        if self.asset not in configuration:
+            print(f"Configuration for {self.asset} not found")
+            return None
+        if chain is None:
+            chain = self.get_chain(api)
+        roll = find_best_rollover(api, chain, existing, contracts)
         if roll is None:
             alert.botFailed(self.asset, "No rollover contract found")
             return None
@@ -39,145 +44,84 @@ class Cc:
 def vertical_contract(
     api, symbol, expiration, strike_low, strike_high, price, amount=1
 ):
-    maxRetries = 75
-    checkFillXTimes = 12
-
     order_id = api.vertical_call_order(
-        symbol, expiration, strike_low, strike_high, price, amount
+        symbol, expiration, strike_low, strike_high, amount=amount, price=price
     )
-
-    for retry in range(maxRetries):
-        for x in range(checkFillXTimes):
-            print("Waiting for order to be filled ...")
-            time.sleep(1)
-            checkedOrder = api.checkOrder(order_id)
-            if checkedOrder["filled"]:
-                print(
-                    f"Order filled: {order_id}\n Order details: {api.checkOrder(order_id)}"
-                )
-                return
-        api.cancelOrder(order_id)
-        print("Can't fill order, retrying with lower price ...")
-        new_price = price * (100 - retry) / 100
-        rounded_price = round_to_nearest_five_cents(new_price)
-        order_id = api.vertical_call_order(
-            symbol, expiration, strike_low, strike_high, rounded_price, amount
-        )
+    api.monitorOrder(order_id, price, checkInterval=1)
 
 
 def roll_contract(api, short, roll, order_premium):
-    maxRetries = 75
-    checkFillXTimes = 12
-
     roll_order_id = api.rollOver(
         short["optionSymbol"], roll["symbol"], short["count"], order_premium
     )
 
-    for retry in range(maxRetries):
-        for x in range(checkFillXTimes):
-            print("Waiting for order to be filled ...")
-            time.sleep(
-                1
-                if datetime.now(get_localzone()).time() >= time_module(15, 45)
-                else (
-                    5
-                    if datetime.now(get_localzone()).time() >= time_module(15, 30)
-                    else 30
-                )
-            )
-            checkedOrder = api.checkOrder(roll_order_id)
-            if checkedOrder["filled"]:
-                print(f"Order filled: {roll_order_id}\n Order details: {checkedOrder}")
-                return
-        api.cancelOrder(roll_order_id)
-        print("Can't fill order, retrying with lower price ...")
-        new_premium = order_premium * (100 - retry) / 100
-        rounded_premium = round_to_nearest_five_cents(new_premium)
-        roll_order_id = api.rollOver(
-            short["optionSymbol"], roll["symbol"], short["count"], rounded_premium
-        )
+    localzone = get_localzone()
+    lastCall = time_module(15, 45)
+    closingTime = time_module(15, 30)
+
+    def checkInterval():
+        # check more often as the market close gets near
+        now = datetime.now(localzone).time()
+        return 1 if now >= lastCall else (5 if now >= closingTime else 30)
+
+    api.monitorOrder(roll_order_id, order_premium, checkInterval)
 
 
 def RollSPX(api, short):
     days = configuration[short["stockSymbol"]]["maxRollOutWindow"]
-    short_expiration = datetime.strptime(short["expiration"], "%Y-%m-%d")
-    toDate = short_expiration + timedelta(days=days)
+    toDate = parse_date(short["expiration"]) + timedelta(days=days)
     optionChain = OptionChain(api, short["stockSymbol"], toDate, days)
     chain = optionChain.get()
-    prem_short_contract = get_median_price(short["optionSymbol"], chain)
-
-    if prem_short_contract is None:
-        print("Short contract not found in chain")
-        return
-
-    print("Premium of short contract: ", round(prem_short_contract, 2))
-    roll = find_best_rollover(api, chain, short)
+    # several lookups below, index the chain once instead of scanning it for each
+    contracts = index_chain(chain)
+    roll = find_best_rollover(api, chain, short, contracts)
     if roll is None:
         print("No rollover contract found")
         return
 
-    roll_premium = get_median_price(roll["symbol"], chain)
-    credit = round(roll_premium - prem_short_contract, 2)
-    ret = api.getOptionDetails(roll["symbol"])
-    ret_expiration = datetime.strptime(ret["expiration"], "%Y-%m-%d")
-    roll_out_time = ret_expiration - short_expiration
-    short_delta = get_option_delta(short["optionSymbol"], chain)
-    print(
-        f"{'Roll:':<12} {short['optionSymbol']} -> {roll['symbol']}\n"
-        f"{'Credit:':<12} ${credit}\n"
-        f"{'Roll-up:':<12} ${float(roll['strike']) - float(short['strike'])}\n"
-        f"{'Roll-out:':<12} {roll_out_time.days} days\n"
-        f"{'Expiration:':<12} {ret['expiration']}\n"
-        f"{'Short Delta:':<12} {round(short_delta,3)} {'New Delta:':<10} {round(ret['delta'],3)}\n"
-        f"{'Trade Delta:':<12} {round(short_delta - ret['delta'],3)}"
-    )
-
-    try:
-        user_input = inputimeout(
-            prompt="Do you want to place the trade? (yes/no): ", timeout=30
-        ).lower()
-    except TimeoutOccurred:
-        user_input = "no"
-
-    if user_input == "yes":
-        roll_contract(api, short, roll, round(credit, 2))
-    else:
-        print("Roll over cancelled")
+    offer_roll(api, short, roll, contracts)
 
 
 def RollCalls(api, short):
     cc = Cc(short["stockSymbol"])
+    chain = cc.get_chain(api)
+    contracts = index_chain(chain) if chain else {}
+    roll = cc.find_new_contract(api, short, chain, contracts)
+    if roll is None:
+        return
+
+    offer_roll(api, short, roll, contracts, checkCoverage=True, extraCredit=0.25)
 
+
+def offer_roll(api, short, roll, contracts, checkCoverage=False, extraCredit=0):
+    """
+    Show the roll of a short into a contract of the chain and place it if confirmed
+    The short and the roll are both in the chain, their quotes are taken from it
+    """
     existingSymbol = short["optionSymbol"]
     amountToBuyBack = short["count"]
-    existingPremium = api.getATMPrice(short["optionSymbol"])
-    short["delta"] = api.getOptionDetails(short["optionSymbol"])["delta"]
+    existingPremium = get_median_price(existingSymbol, contracts)
+    short_delta = get_option_delta(existingSymbol, contracts)
     print(
         f"Existing symbol: {existingSymbol} "
         f"Amount to buy back: {amountToBuyBack} "
         f"Existing premium: {round(existingPremium,2)}"
     )
 
-    new = cc.find_new_contract(api, short)
-    if new is None:
-        return
-
     print("The bot wants to write the following contract:")
-    roll_premium = statistics.median([new["bid"], new["ask"]])
+    roll_premium = get_median_price(roll["symbol"], contracts)
     credit = round(roll_premium - existingPremium, 2)
 
-    ret = api.getOptionDetails(new["symbol"])
-    ret_expiration = datetime.strptime(ret["expiration"], "%Y-%m-%d")
-    short_expiration = datetime.strptime(short["expiration"], "%Y-%m-%d")
-    roll_out_time = ret_expiration - short_expiration
+    roll_expiration = contracts[roll["symbol"]][0]["date"]
+    roll_out_time = parse_date(roll_expiration) - parse_date(short["expiration"])
     print(
-        f"{'Roll:':<12} {existingSymbol} -> {new['symbol']}\n"
+        f"{'Roll:':<12} {existingSymbol} -> {roll['symbol']}\n"
         f"{'Credit:':<12} ${credit}\n"
-        f"{'Roll-up:':<12} ${float(new['strike']) - float(short['strike'])}\n"
+        f"{'Roll-up:':<12} ${float(roll['strike']) - float(short['strike'])}\n"
         f"{'Roll-out:':<12} {roll_out_time.days} days\n"
-        f"{'Expiration:':<12} {ret['expiration']}\n"
-        f"{'Short Delta:':<12} {round(short['delta'],3)} {'New Delta:':<10} {round(ret['delta'],3)}\n"
-        f"{'Trade Delta:':<12} {round(short['delta'] - ret['delta'],3)}"
+        f"{'Expiration:':<12} {roll_expiration}\n"
+        f"{'Short Delta:':<12} {round(short_delta,3)} {'New Delta:':<10} {round(roll['delta'],3)}\n"
+        f"{'Trade Delta:':<12} {round(short_delta - roll['delta'],3)}"
     )
 
     try:
@@ -187,44 +131,42 @@ def RollCalls(api, short):
     except TimeoutOccurred:
         user_input = "no"
 
-    if user_input == "yes":
-        if not api.checkAccountHasEnoughToCover(
-            short["stockSymbol"],
-            existingSymbol,
-            amountToBuyBack,
-            amountToBuyBack,
-            new["strike"],
-            ret["expiration"],
-        ):
-            return alert.botFailed(
-                short["stockSymbol"],
-                f"The account doesn't have enough shares or options to cover selling {amountToBuyBack} cc(s)",
-            )
-        roll_contract(api, short, new, round(credit + 0.25, 2))
-    else:
+    if user_input != "yes":
         print("Roll over cancelled")
+        return
+
+    if checkCoverage and not api.checkAccountHasEnoughToCover(
+        short["stockSymbol"],
+        existingSymbol,
+        amountToBuyBack,
+        amountToBuyBack,
+        roll["strike"],
+        roll_expiration,
+    ):
+        return alert.botFailed(
+            short["stockSymbol"],
+            f"The account doesn't have enough shares or options to cover selling {amountToBuyBack} cc(s)",
+        )
+    roll_contract(api, short, roll, round(credit + extraCredit, 2))
 
 
-def find_best_rollover(api, data, short_option):
+def find_best_rollover(api, data, short_option, contracts=None):
     short_strike, short_price, short_expiry, underlying_price = parse_option_details(
-        api, data, short_option["optionSymbol"]
+        api, data, short_option["optionSymbol"], contracts
     )
     if short_strike is None or short_price is None or short_expiry is None:
         return None
 
     # Configuration variables
-    ITMLimit = configuration[short_option["stockSymbol"]].get("ITMLimit", 10)
-    deepITMLimit = configuration[short_option["stockSymbol"]].get("deepITMLimit", 25)
-    deepOTMLimit = configuration[short_option["stockSymbol"]].get("deepOTMLimit", 10)
-    minPremium = configuration[short_option["stockSymbol"]].get("minPremium", 1)
-    idealPremium = configuration[short_option["stockSymbol"]].get("idealPremium", 15)
-    minRollupGap = configuration[short_option["stockSymbol"]].get("minRollupGap", 5)
-    maxRollOutWindow = configuration[short_option["stockSymbol"]].get(
-        "maxRollOutWindow", 30
-    )
-    minRollOutWindow = configuration[short_option["stockSymbol"]].get(
-        "minRollOutWindow", 7
-    )
+    cfg = configuration[short_option["stockSymbol"]]
+    ITMLimit = cfg.get("ITMLimit", 10)
+    deepITMLimit = cfg.get("deepITMLimit", 25)
+    deepOTMLimit = cfg.get("deepOTMLimit", 10)
+    minPremium = cfg.get("minPremium", 1)
+    idealPremium = cfg.get("idealPremium", 15)
+    minRollupGap = cfg.get("minRollupGap", 5)
+    maxRollOutWindow = cfg.get("maxRollOutWindow", 30)
+    minRollOutWindow = cfg.get("minRollOutWindow", 7)
 
     logger.debug(f"Initial Ideal Premium: {idealPremium}")
 
@@ -254,424 +196,185 @@ def find_best_rollover(api, data, short_option):
     else:
         print(f"Short status: {short_status}. Strike - Underlying: {value}")
 
+    # parse every expiration once, and only keep the ones in the roll out
+    # window; the sort below then only runs its key for those
+    entries = []
+    for entry in data:
+        expiry_date = parse_date(entry["date"])
+        days_diff = (expiry_date - short_expiry).days
+        if minRollOutWindow <= days_diff <= maxRollOutWindow:
+            entries.append((expiry_date, days_diff, entry))
+
     if short_status == "deep_ITM":
         # sorts data first by date in descending order (farthest first, earliest last) and then by strike price in descending order (highest strike first)
-        entries = sorted(
-            data,
-            key=lambda entry: (
-                -datetime.strptime(entry["date"], "%Y-%m-%d").timestamp(),
+        entries.sort(
+            key=lambda item: (
+                -item[0].timestamp(),
                 -max(
                     contract["strike"]
-                    for contract in entry["contracts"]
+                    for contract in item[2]["contracts"]
                     if "strike" in contract
                 ),
             ),
         )
     else:
         # sorts data first by date in ascending order (earliest first, farthest last) and then by strike price in descending order (highest strike first)
-        entries = sorted(
-            data,
-            key=lambda entry: (
-                datetime.strptime(entry["date"], "%Y-%m-%d").timestamp(),
+        entries.sort(
+            key=lambda item: (
+                item[0].timestamp(),
                 -max(
                     contract["strike"]
-                    for contract in entry["contracts"]
+                    for contract in item[2]["contracts"]
                     if "strike" in contract
                 ),
             ),
         )
 
-    # Initialize best option
-    best_option = None
-    closest_days_diff = float("inf")
-    highest_strike = float("-inf")
-
-    # Iterate to find the best rollover option
-    while short_status and best_option is None:
-
-        for entry in entries:
-            expiry_date = datetime.strptime(entry["date"], "%Y-%m-%d")
-            days_diff = (expiry_date - short_expiry).days
-            if days_diff > maxRollOutWindow or days_diff < minRollOutWindow:
+    # the contracts in the window and their premium don't depend on
+    # the criteria, collect them once instead of on every pass below
+    short_root = short_option["optionSymbol"].partition(" ")[0]
+    candidates = []
+    for _, days_diff, entry in entries:
+        for contract in entry["contracts"]:
+            if (
+                contract["strike"] <= short_strike
+                or contract["optionRoot"] != short_root
+            ):
                 continue
-            for contract in entry["contracts"]:
-                if (
-                    contract["strike"] <= short_strike
-                    or contract["optionRoot"] != short_option["optionSymbol"].split()[0]
-                ):
-                    continue
-                contract_price = round(
-                    statistics.median([contract["bid"], contract["ask"]]), 2
-                )
-                premium_diff = contract_price - short_price
-                logger.debug(
-                    f"Contract: {contract['symbol']}, Premium: {contract_price}, Days: {days_diff}, Premium Diff: {premium_diff}, Ideal Premium: {idealPremium}, Strike: {contract['strike']}"
-                )
-                if short_status in ["deep_OTM", "OTM", "just_ITM"]:
-                    if (
-                        contract["strike"] >= short_strike + minRollupGap
-                        and premium_diff >= idealPremium
-                    ):
-                        if days_diff < closest_days_diff:
-                            closest_days_diff = days_diff
-                            best_option = contract
-
-                elif short_status == "ITM":
-                    if (
-                        premium_diff >= minPremium
-                        and contract["strike"] >= short_strike + minRollupGap
-                    ):
-                        if contract["strike"] > highest_strike or (
-                            contract["strike"] == highest_strike
-                            and days_diff < closest_days_diff
-                        ):
-                            highest_strike = contract["strike"]
-                            closest_days_diff = days_diff
-                            best_option = contract
-
-                elif short_status == "deep_ITM":
-                    # Roll to the highest strike without paying a premium
-                    if premium_diff >= 0.1 and contract["strike"] > highest_strike:
-                        highest_strike = contract["strike"]
-                        closest_days_diff = days_diff
-                        best_option = contract
-
-        # Adjust criteria if no best option found
-        if best_option is None:
+            contract_price = round((contract["bid"] + contract["ask"]) / 2, 2)
+            premium_diff = contract_price - short_price
             logger.debug(
-                f"Before adjustment - IdealPremium: {idealPremium}, MinRollupGap: {minRollupGap}"
+                f"Contract: {contract['symbol']}, Premium: {contract_price}, Days: {days_diff}, Premium Diff: {premium_diff}, Strike: {contract['strike']}"
             )
-            if short_status in ["deep_OTM", "OTM", "just_ITM"]:
-                if idealPremium > minPremium:
-                    idealPremium = max(idealPremium - 0.5, minPremium)
-                elif minRollupGap > 0:
-                    minRollupGap = max(minRollupGap - 5, 0)
-            elif short_status == "ITM":
-                if minRollupGap > 0:
-                    minRollupGap = max(minRollupGap - 5, 0)
-                elif minPremium > 0:
-                    minPremium = max(minPremium - 0.25, 0)
-
-            logger.debug(
-                f"After adjustment - IdealPremium: {idealPremium}, MinRollupGap: {minRollupGap}"
-            )
-    return best_option
-
+            candidates.append((contract, days_diff, premium_diff))
 
-def find_best_rollover_old(api, data, short_option):
-    short_strike, short_price, short_expiry, underlying_price = parse_option_details(
-        api, data, short_option["optionSymbol"]
-    )
-    if short_strike is None or short_price is None or short_expiry is None:
+    # no amount of relaxing the criteria finds a contract then
+    if not candidates:
         return None
 
-    # Configuration variables
-    ITMLimit = configuration[short_option["stockSymbol"]].get("ITMLimit", 10)
-    deepITMLimit = configuration[short_option["stockSymbol"]].get("deepITMLimit", 25)
-    deepOTMLimit = configuration[short_option["stockSymbol"]].get("deepOTMLimit", 10)
-    minPremium = configuration[short_option["stockSymbol"]].get("minPremium", 1)
-    idealPremium = configuration[short_option["stockSymbol"]].get("idealPremium", 15)
-    minRollupGap = configuration[short_option["stockSymbol"]].get("minRollupGap", 5)
-    maxRollOutWindow = configuration[short_option["stockSymbol"]].get(
-        "maxRollOutWindow", 30
-    )
-    minRollOutWindow = configuration[short_option["stockSymbol"]].get(
-        "minRollOutWindow", 7
-    )
-
-    logger.debug(f"Initial Ideal Premium: {idealPremium}")
-
-    # Determine the short status
-    short_status = None
-    if short_strike > underlying_price + deepOTMLimit:
-        short_status = "deep_OTM"
-    elif short_strike > underlying_price:
-        short_status = "OTM"
-    elif short_strike + ITMLimit > underlying_price:
-        short_status = "just_ITM"
-    elif short_strike + deepITMLimit > underlying_price:
-        short_status = "ITM"
+    # the criteria from the strictest to the most relaxed, as (roll-up gap,
+    # premium) pairs; they are relaxed step by step until a contract fits
+    if short_status in ["deep_OTM", "OTM", "just_ITM"]:
+        levels = [(minRollupGap, idealPremium)]
+        while idealPremium > minPremium:
+            idealPremium = max(idealPremium - 0.5, minPremium)
+            levels.append((minRollupGap, idealPremium))
+        while minRollupGap > 0:
+            minRollupGap = max(minRollupGap - 5, 0)
+            levels.append((minRollupGap, idealPremium))
+    elif short_status == "ITM":
+        levels = [(minRollupGap, minPremium)]
+        while minRollupGap > 0:
+            minRollupGap = max(minRollupGap - 5, 0)
+            levels.append((minRollupGap, minPremium))
+        while minPremium > 0:
+            minPremium = max(minPremium - 0.25, 0)
+            levels.append((minRollupGap, minPremium))
     else:
-        short_status = "deep_ITM"
-
-    value = round(short_strike - underlying_price, 2)
-
-    if value > 0:
-        print(
-            f"Short status: {Fore.GREEN}{short_status}{Style.RESET_ALL}. Strike - Underlying: {Fore.GREEN}{value}{Style.RESET_ALL}"
-        )
-    elif value < 0:
-        print(
-            f"Short status: {Fore.RED}{short_status}{Style.RESET_ALL}. Strike - Underlying: {Fore.RED}{value}{Style.RESET_ALL}"
-        )
-    else:
-        print(f"Short status: {short_status}. Strike - Underlying: {value}")
-
-    # Sort entries
-    entries = sorted(
-        data,
-        key=lambda entry: (
-            datetime.strptime(entry["date"], "%Y-%m-%d"),
-            -max(
-                contract["strike"]
-                for contract in entry["contracts"]
-                if "strike" in contract
-            ),
-        ),
-    )
-
-    # Initialize best option
+        # Roll to the highest strike without paying a premium
+        levels = [(0, 0.1)]
+
+    logger.debug(f"Criteria (roll-up gap, premium): {levels}")
+
+    def first_level(strike, premium_diff):
+        # every level only loosens the one before, search for the first one
+        # the contract meets; len(levels) if it meets none
+        lo, hi = 0, len(levels)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            gap, premium = levels[mid]
+            if strike >= short_strike + gap and premium_diff >= premium:
+                hi = mid
+            else:
+                lo = mid + 1
+        return lo
+
+    # one pass finds what relaxing the criteria and rescanning would: the best
+    # of the contracts meeting the strictest level any contract meets
     best_option = None
+    best_level = len(levels)
     closest_days_diff = float("inf")
     highest_strike = float("-inf")
 
-    # Iterate to find the best rollover option
-    while short_status and best_option is None:
+    for contract, days_diff, premium_diff in candidates:
+        strike = contract["strike"]
+        level = first_level(strike, premium_diff)
+        if level == len(levels) or level > best_level:
+            continue
 
-        for entry in entries:
-            expiry_date = datetime.strptime(entry["date"], "%Y-%m-%d")
-            days_diff = (expiry_date - short_expiry).days
-            if days_diff > maxRollOutWindow or days_diff < minRollOutWindow:
+        if level < best_level:
+            best_level = level
+        elif short_status in ["deep_OTM", "OTM", "just_ITM"]:
+            if days_diff >= closest_days_diff:
                 continue
-            for contract in entry["contracts"]:
-                if (
-                    contract["strike"] <= short_strike
-                    or contract["optionRoot"] != short_option["optionSymbol"].split()[0]
-                ):
-                    print(
-                        f"Skipping contract: {contract['symbol']} containing {contract['optionRoot']}"
-                    )
-                    continue
-                contract_price = round(
-                    statistics.median([contract["bid"], contract["ask"]]), 2
-                )
-                premium_diff = contract_price - short_price
-                if short_status in ["deep_OTM", "OTM", "just_ITM"]:
-                    if (
-                        contract["strike"] >= short_strike + minRollupGap
-                        and premium_diff >= idealPremium
-                    ):
-                        logger.debug(
-                            f"Contract: {contract['symbol']}, Premium: {contract_price}, Days: {days_diff}, Premium Diff: {premium_diff}, Ideal Premium: {idealPremium}, Strike: {contract['strike']}"
-                        )
-                        if days_diff < closest_days_diff:
-                            closest_days_diff = days_diff
-                            best_option = contract
-
-                elif short_status == "ITM":
-                    if premium_diff >= minPremium and (
-                        contract["strike"] > highest_strike
-                        or (
-                            contract["strike"] == highest_strike
-                            and days_diff < closest_days_diff
-                        )
-                    ):
-                        highest_strike = contract["strike"]
-                        closest_days_diff = days_diff
-                        best_option = contract
-
-                elif short_status == "deep_ITM":
-                    # Roll to the highest strike without paying a premium
-                    if premium_diff >= 0.1 and contract["strike"] > highest_strike:
-                        highest_strike = contract["strike"]
-                        closest_days_diff = days_diff
-                        best_option = contract
-
-        # Adjust criteria if no best option found
-        if best_option is None and short_status in ["deep_OTM", "OTM", "just_ITM"]:
-            logger.debug(
-                f"Before adjustment - IdealPremium: {idealPremium}, MinRollupGap: {minRollupGap}"
-            )
-            if idealPremium > minPremium:
-                idealPremium -= 0.5
-                if idealPremium < minPremium:
-                    idealPremium = minPremium
-            elif minRollupGap > 0:
-                minRollupGap -= 5
-                if minRollupGap < 0:
-                    minRollupGap = 0
-            logger.debug(
-                f"After adjustment - IdealPremium: {idealPremium}, MinRollupGap: {minRollupGap}"
-            )
-        if best_option is None and short_status in ["ITM", "deep_ITM"]:
-            minPremium -= 0.25
-            if minPremium < 0:
-                break  # Avoid going negative on the premium
-
-    return best_option
-
-
-def find_best_rollover_old_2(api, data, short_option):
-
-    short_strike, short_price, short_expiry, underlying_price = parse_option_details(
-        api, data, short_option["optionSymbol"]
-    )
-    if short_strike is None or short_price is None or short_expiry is None:
-        return None
+        elif short_status == "ITM":
+            if strike < highest_strike or (
+                strike == highest_strike and days_diff >= closest_days_diff
+            ):
+                continue
+        elif strike <= highest_strike:
+            continue
 
-    # Configuration variables
-    ITMLimit = configuration[short_option["stockSymbol"]].get("ITMLimit", 10)
-    deepITMLimit = configuration[short_option["stockSymbol"]].get("deepITMLimit", 25)
-    deepOTMLimit = configuration[short_option["stockSymbol"]].get("deepOTMLimit", 10)
-    minPremium = configuration[short_option["stockSymbol"]].get("minPremium", 1)
-    idealPremium = configuration[short_option["stockSymbol"]].get("idealPremium", 2.5)
-    minRollupGap = configuration[short_option["stockSymbol"]].get("minRollupGap", 5)
-    maxRollOutWindow = configuration[short_option["stockSymbol"]].get(
-        "maxRollOutWindow", 30
-    )
-    minRollOutWindow = configuration[short_option["stockSymbol"]].get(
-        "minRollOutWindow", 7
-    )
-    # desiredDelta = configuration[short_option["stockSymbol"]].get("desiredDelta", 0.3)
+        highest_strike = strike
+        closest_days_diff = days_diff
+        best_option = contract
 
-    # Determine the short status
-    short_status = None
-    if short_strike > underlying_price + deepOTMLimit:
-        short_status = "deep_OTM"
-    elif short_strike > underlying_price:
-        short_status = "OTM"
-    elif short_strike + ITMLimit > underlying_price:
-        short_status = "just_ITM"
-    elif short_strike + deepITMLimit > underlying_price:
-        short_status = "ITM"
-    else:
-        short_status = "deep_ITM"
+    return best_option
 
-    value = round(short_strike - underlying_price, 2)
 
-    if value > 0:
-        print(
-            f"Short status: {Fore.GREEN}{short_status}{Style.RESET_ALL}. Strike - Underlying: {Fore.GREEN}{value}{Style.RESET_ALL}"
-        )
-    elif value < 0:
-        print(
-            f"Short status: {Fore.RED}{short_status}{Style.RESET_ALL}. Strike - Underlying: {Fore.RED}{value}{Style.RESET_ALL}"
-        )
+# This function can be used to parse the option chain returned from the optionchain.get() function.
+# data is the chain returned from that function and option_symbol is the symbol of the option you want to parse.
+# contracts is the chain's index_chain(), when the caller already built one.
+def parse_option_details(api, data, option_symbol, contracts=None):
+    if contracts is not None:
+        entry, contract = contracts.get(option_symbol, (None, None))
     else:
-        print(f"Short status: {short_status}. Strike - Underlying: {value}")
+        entry, contract = find_contract(data, option_symbol)
+    if contract is None:
+        return None, None, None, None
 
-    # Sort entries
-    entries = sorted(
-        data,
-        key=lambda entry: (
-            datetime.strptime(entry["date"], "%Y-%m-%d"),
-            -max(
-                contract["strike"]
-                for contract in entry["contracts"]
-                if "strike" in contract
-            ),
-        ),
-    )
+    short_strike = contract["strike"]
+    short_price = round((contract["bid"] + contract["ask"]) / 2, 2)
+    short_expiry = parse_date(entry["date"])
+    underlying_price = api.getATMPrice(contract["underlying"])
+    return short_strike, short_price, short_expiry, underlying_price
 
-    # Initialize best option
-    best_option = None
-    closest_days_diff = float("inf")
-    highest_strike = float("-inf")
 
-    # Iterate to find the best rollover option
-    while short_status and best_option is None:
+def round_to_nearest_five_cents(n):
+    return math.ceil(n * 20) / 20
 
-        for entry in entries:
-            expiry_date = datetime.strptime(entry["date"], "%Y-%m-%d")
-            days_diff = (expiry_date - short_expiry).days
-            if days_diff > maxRollOutWindow or days_diff < minRollOutWindow:
-                continue
-            for contract in entry["contracts"]:
-                if (
-                    contract["strike"] <= short_strike
-                    or contract["optionRoot"] != contract["symbol"].split()[0]
-                ):
-                    continue
-                contract_price = round(
-                    statistics.median([contract["bid"], contract["ask"]]), 2
-                )
-                premium_diff = contract_price - short_price
-                if short_status in ["deep_OTM", "OTM", "just_ITM"]:
-                    if (
-                        contract["strike"] >= short_strike + minRollupGap
-                        and premium_diff >= idealPremium
-                    ):
-                        logger.debug(
-                            f"Contract: {contract['symbol']}, Premium: {contract_price}, Days: {days_diff}, Premium Diff: {premium_diff}, Ideal Premium: {idealPremium}, Strike: {contract['strike']}"
-                        )
-                        if days_diff < closest_days_diff:
-                            closest_days_diff = days_diff
-                            best_option = contract
-
-                elif short_status == "ITM":
-                    if premium_diff >= minPremium and (
-                        contract["strike"] > highest_strike
-                        or (
-                            contract["strike"] == highest_strike
-                            and days_diff < closest_days_diff
-                        )
-                    ):
-                        highest_strike = contract["strike"]
-                        closest_days_diff = days_diff
-                        best_option = contract
-
-                elif short_status == "deep_ITM":
-                    # Roll to the highest strike without paying a premium
-                    if premium_diff >= 0.1 and contract["strike"] > highest_strike:
-                        highest_strike = contract["strike"]
-                        closest_days_diff = days_diff
-                        best_option = contract
-
-        # Adjust criteria if no best option found
-        if best_option is None and short_status in ["deep_OTM", "OTM", "just_ITM"]:
-            while idealPremium > minPremium or minRollupGap > 0:
-                if idealPremium > minPremium:
-                    idealPremium -= 0.5
-                    if idealPremium < minPremium:
-                        idealPremium = minPremium
-                elif minRollupGap > 0:
-                    minRollupGap -= 5
-                    if minRollupGap < 0:
-                        minRollupGap = 0
-                logger.debug(
-                    f"Adjusting criteria - IdealPremium: {idealPremium}, MinRollupGap: {minRollupGap}"
-                )
-        if best_option is None and short_status in ["ITM", "deep_ITM"]:
-            minPremium -= 0.25
-            if minPremium < 0:
-                break  # Avoid going negative on the premium
 
-    return best_option
+def price_ladder(price, steps):
+    # the rounded price of every retry, each step 1% below the starting price
+    return [math.ceil(price * (100 - step) / 100 * 20) / 20 for step in range(steps)]
 
 
-# This function can be used to parse the option chain returned from the optionchain.get() function.
-# data is the chain returned from that function and option_symbol is the symbol of the option you want to parse.
-def parse_option_details(api, data, option_symbol):
+def find_contract(data, symbol):
     for entry in data:
         for contract in entry["contracts"]:
-            if contract["symbol"] == option_symbol:
-                short_strike = contract["strike"]
-                short_price = round(
-                    statistics.median([contract["bid"], contract["ask"]]), 2
-                )
-                short_expiry = datetime.strptime(entry["date"], "%Y-%m-%d")
-                underlying_price = api.getATMPrice(contract["underlying"])
-                return short_strike, short_price, short_expiry, underlying_price
-    return None, None, None, None
+            if contract["symbol"] == symbol:
+                return entry, contract
+    return None, None
 
 
-def round_to_nearest_five_cents(n):
-    return math.ceil(n * 20) / 20
+def index_chain(data):
+    # (entry, contract) of a chain returned from optionchain.get() by symbol
+    return {
+        contract["symbol"]: (entry, contract)
+        for entry in data
+        for contract in entry["contracts"]
+    }
 
 
-def get_median_price(symbol, data):
-    for entry in data:
-        for contract in entry["contracts"]:
-            if contract["symbol"] == symbol:
-                bid = contract["bid"]
-                ask = contract["ask"]
-                return (bid + ask) / 2
-    return None
+def get_median_price(symbol, contracts):
+    entry, contract = contracts.get(symbol, (None, None))
+    if contract is None:
+        return None
+    return (contract["bid"] + contract["ask"]) / 2
 
 
-def get_option_delta(symbol, data):
-    for entry in data:
-        for contract in entry["contracts"]:
-            if contract["symbol"] == symbol:
-                return contract["delta"]
-    return None
+def get_option_delta(symbol, contracts):
+    entry, contract = contracts.get(symbol, (None, None))
+    if contract is None:
+        return None
+    return contract["delta"]
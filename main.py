@@ -23,7 +23,7 @@ def roll_short_positions(api, shorts):
     today = datetime.now(pytz.UTC).date()
 
     for short in shorts:
-        dte = (datetime.strptime(short["expiration"], "%Y-%m-%d").date() - today).days
+        dte = (support.parse_date(short["expiration"]).date() - today).days
         # short = {"optionSymbol": "SPXW  240622C05100000", "expiration": "2024-06-22", "strike": "5100", "count": 1.0, "stockSymbol": "$SPX", "receivedPremium": 72.4897}
         # short = {'stockSymbol': 'MSFT', 'optionSymbol': 'MSFT  240531C00350000', 'expiration': '2024-05-31', 'count': 1.0, 'strike': '350', 'receivedPremium': 72.4897}
         if -1 < dte < 7:
@@ -129,8 +129,14 @@ def main():
                     alert.botFailed(None, "Failed to setup the API: " + str(e))
                     return
 
-                execWindow = api.getOptionExecutionWindow()
-                shorts = api.updateShortPosition()
+                try:
+                    execWindow = api.getOptionExecutionWindow()
+                    shorts = api.updateShortPosition()
+                except Exception as e:
+                    if not api.dropStaleClient(e):
+                        raise
+                    print("The login went stale, logging in again ...")
+                    continue
 
                 logger.debug(f"Execution: {execWindow}")
 
@@ -1,5 +1,3 @@
-from statistics import median
-
 import alert
 from support import validDateFormat
 
@@ -38,73 +36,26 @@ class OptionChain:
 
                 contracts = []
 
-                for contractKey, contractValue in value.items():
-                    contracts.extend(
-                        [
-                            {
-                                "symbol": contractValue[0]["symbol"],
-                                "strike": contractValue[0]["strikePrice"],
-                                "bid": contractValue[0]["bid"],
-                                "ask": contractValue[0]["ask"],
-                                "delta": contractValue[0]["delta"],
-                                "theta": contractValue[0]["theta"],
-                                "vega": contractValue[0]["vega"],
-                                "gamma": contractValue[0]["gamma"],
-                                "rho": contractValue[0]["rho"],
-                                "optionRoot": contractValue[0]["optionRoot"],
-                                "underlying": contractValue[0][
-                                    "optionDeliverablesList"
-                                ][0]["symbol"],
-                                "putCall": contractValue[0]["putCall"],
-                            }
-                        ]
-                    )
-
-                map.extend([{"date": date, "days": days, "contracts": contracts}])
-
-        except KeyError:
-            return alert.botFailed(self.asset, "Wrong data from api")
-
-        if map:
-            map = sorted(map, key=lambda d: d["days"])
-
-        return map
-
-    def mapApiData_working(self, data):
-        # convert api response to data the application can read
-        map = []
-
-        try:
-            tmp = data["callExpDateMap"]
-            for key, value in tmp.items():
-                split = key.split(":")
-
-                date = split[0]
-                days = int(split[1])
-
-                if not validDateFormat(date):
-                    return alert.botFailed(
-                        self.asset, "Incorrect date format from api: " + date
-                    )
-
-                contracts = []
-
-                for contractKey, contractValue in value.items():
-                    contracts.extend(
-                        [
-                            {
-                                "symbol": contractValue[0]["symbol"],
-                                "strike": contractValue[0]["strikePrice"],
-                                "bid": contractValue[0]["bid"],
-                                "ask": contractValue[0]["ask"],
-                                "delta": contractValue[0]["delta"],
-                                "optionRoot": contractValue[0]["optionRoot"],
-                                "underlying": contractValue[0][
-                                    "optionDeliverablesList"
-                                ][0]["symbol"],
-                                "putCall": contractValue[0]["putCall"],
-                            }
-                        ]
+                for contractValue in value.values():
+                    # look the contract up once, not once per field
+                    contract = contractValue[0]
+                    contracts.append(
+                        {
+                            "symbol": contract["symbol"],
+                            "strike": contract["strikePrice"],
+                            "bid": contract["bid"],
+                            "ask": contract["ask"],
+                            "delta": contract["delta"],
+                            "theta": contract["theta"],
+                            "vega": contract["vega"],
+                            "gamma": contract["gamma"],
+                            "rho": contract["rho"],
+                            "optionRoot": contract["optionRoot"],
+                            "underlying": contract["optionDeliverablesList"][0][
+                                "symbol"
+                            ],
+                            "putCall": contract["putCall"],
+                        }
                     )
 
                 map.extend([{"date": date, "days": days, "contracts": contracts}])
@@ -142,7 +93,7 @@ class OptionChain:
             if contract["strike"] < minStrike:
                 break
 
-            if median([contract["bid"], contract["ask"]]) >= minYield:
+            if (contract["bid"] + contract["ask"]) / 2 >= minYield:
                 return contract
 
         return None
@@ -1,5 +1,3 @@
-import json
-import statistics
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
 
@@ -9,7 +7,7 @@ from prettytable import PrettyTable
 from cc import round_to_nearest_five_cents
 from configuration import spreads
 from optionChain import OptionChain
-from support import calculate_cagr
+from support import calculate_cagr, parse_date
 
 
 def BoxSpread(api, asset="$SPX"):
@@ -26,28 +24,8 @@ def BoxSpread(api, asset="$SPX"):
     calls = option_chain.mapApiData(calls)
     puts = option_chain.mapApiData(puts, put=True)
 
-    calls = sorted(
-        calls,
-        key=lambda entry: (
-            datetime.strptime(entry["date"], "%Y-%m-%d"),
-            -max(
-                contract["strike"]
-                for contract in entry["contracts"]
-                if "strike" in contract
-            ),
-        ),
-    )
-    puts = sorted(
-        puts,
-        key=lambda entry: (
-            datetime.strptime(entry["date"], "%Y-%m-%d"),
-            -max(
-                contract["strike"]
-                for contract in entry["contracts"]
-                if "strike" in contract
-            ),
-        ),
-    )
+    calls = sort_chain(calls)
+    puts = sort_chain(puts)
     best_overall_spread = None
     best_overall_cagr = float("-inf")
 
@@ -97,17 +75,81 @@ def BoxSpread(api, asset="$SPX"):
         print("No best spread found.")
 
 
+def sort_chain(chain):
+    # by date, then highest strike first; the dates are YYYY-MM-DD, which sort
+    # as strings the same way the dates do, so they aren't parsed for this
+    return sorted(
+        chain,
+        key=lambda entry: (
+            entry["date"],
+            -max(
+                contract["strike"]
+                for contract in entry["contracts"]
+                if "strike" in contract
+            ),
+        ),
+    )
+
+
+def spread_pairs(strikes, spread):
+    # (i, j) of every pair of the sorted strikes that are exactly spread apart
+    for i, strike in enumerate(strikes):
+        for j in range(i + 1, len(strikes)):
+            # the strikes are sorted, none of the rest can be spread above
+            if strikes[j] - strike > spread:
+                break
+            if strikes[j] - strike == spread:
+                yield i, j
+
+
+def mid_prices(contracts):
+    # midpoint of the bid and ask of every contract, in the same order; a
+    # contract can be a leg of several pairs, so they are priced up front
+    return [(c["bid"] + c["ask"]) / 2 for c in contracts]
+
+
+def spread_result(asset, spread, best):
+    # the result of bull_call_spread and synthetic_covered_call_spread, from the
+    # (date, low, high, net_debit, cagr, cagr_percentage, downside_protection)
+    # they kept for their best spread
+    (
+        date,
+        low,
+        high,
+        net_debit,
+        cagr,
+        cagr_percentage,
+        downside_protection,
+    ) = best
+    return {
+        "asset": asset,
+        "date": date,
+        "strike1": low["strike"],
+        "bid1": low["bid"],
+        "ask1": low["ask"],
+        "bid2": high["bid"],
+        "ask2": high["ask"],
+        "strike2": high["strike"],
+        "net_debit": round(net_debit, 2),
+        "cagr": round(cagr, 2),
+        "cagr_percentage": round(cagr_percentage, 2),
+        "downside_protection": round(downside_protection * 100, 2),
+        "total_investment": round(net_debit * 100, 2),
+        "total_return": round((spread - net_debit) * 100, 2),
+    }
+
+
 def calculate_box_spread_wrapper(spread, calls, puts):
     return (
-        calculate_box_spread(spread, json.dumps(calls), json.dumps(puts), trade="sell"),
+        calculate_box_spread(spread, calls, puts, trade="sell"),
         spread,
     )
 
 
-def calculate_box_spread(spread, calls, puts, trade="Sell", price="natural"):
-    # Parse the JSON option chain
-    calls_chain = json.loads(calls)
-    puts_chain = json.loads(puts)
+def calculate_box_spread(
+    spread, calls_chain, puts_chain, trade="Sell", price="natural"
+):
+    # the chains are only read here, so every worker can share the same lists
     highest_cagr = None
 
     if trade == "buy":
@@ -115,107 +157,97 @@ def calculate_box_spread(spread, calls, puts, trade="Sell", price="natural"):
     elif trade == "sell":
         highest_cagr = float("-inf")
     best_spread = None
+    # these don't change from one pair of strikes to the next
+    trade_type = trade.lower()
+    use_mid = price.lower() in ["mid", "market"]
+    today = datetime.today().date()
 
     # Iterate over the option chain
     for entry in zip(calls_chain, puts_chain):
+        days = (parse_date(entry[0]["date"]).date() - today).days
         call_contracts = sorted(entry[0]["contracts"], key=lambda c: c["strike"])
         put_contracts = sorted(entry[1]["contracts"], key=lambda c: c["strike"])
         # print(f"Call Contracts: {call_contracts}")
         # print(f"Put Contracts: {put_contracts}")
-        for i in range(len(call_contracts)):
+        strikes = [contract["strike"] for contract in call_contracts]
+        if use_mid:
+            call_mids = mid_prices(call_contracts)
+            put_mids = mid_prices(put_contracts)
+        for i, j in spread_pairs(strikes, spread):
             low_call = low_put = high_call = high_put = None
-            # Find the next contract with a strike that is 'spread' above this one
-            for j in range(i + 1, len(call_contracts)):
-                if call_contracts[j]["strike"] - call_contracts[i]["strike"] == spread:
-                    # Calculate net credit received by buying and selling options
-                    if price.lower() in ["mid", "market"]:
-                        # we need to calculate the median of the bid and ask prices for put and call options
-                        low_call = statistics.median(
-                            [call_contracts[i]["bid"], call_contracts[i]["ask"]]
-                        )
-                        low_put = statistics.median(
-                            [put_contracts[i]["bid"], put_contracts[i]["ask"]]
-                        )
-                        high_call = statistics.median(
-                            [call_contracts[j]["bid"], call_contracts[j]["ask"]]
-                        )
-                        high_put = statistics.median(
-                            [put_contracts[j]["bid"], put_contracts[j]["ask"]]
-                        )
-                    else:  # assuming 'natural' price
-                        if trade.lower() == "buy":
-                            low_call = call_contracts[i]["ask"]
-                            low_put = put_contracts[i]["bid"]
-                            high_call = call_contracts[j]["bid"]
-                            high_put = put_contracts[j]["ask"]
-                        elif trade.lower() == "sell":
-                            low_call = call_contracts[i]["bid"]
-                            low_put = put_contracts[i]["ask"]
-                            high_call = call_contracts[j]["ask"]
-                            high_put = put_contracts[j]["bid"]
-                    if None not in [low_call, high_put, high_call, low_put]:
-                        # print(f"Low Call: {low_call}, Low Put: {low_put}, High Call: {high_call}, High Put: {high_put}")
-                        if trade.lower() == "buy":  # debit
-                            trade_price = low_put + high_call - high_put - low_call
-                            trade_price = -trade_price
-                        elif trade.lower() == "sell":  # credit
-                            trade_price = low_call + high_put - high_call - low_put
-                    else:
-                        continue
-                    # print(f"Trade Price: {trade_price}. Strike 1: {call_contracts[i]['strike']}, Strike 2: {call_contracts[j]['strike']}, date: {entry[0]['date']}")
-                    low_strike = call_contracts[i]["strike"]
-                    high_strike = call_contracts[j]["strike"]
-
-                    days = (
-                        datetime.strptime(entry[0]["date"], "%Y-%m-%d").date()
-                        - datetime.today().date()
-                    ).days
-                    if days > 1 and trade_price > 0:
-                        if trade.lower() == "buy":
-                            cagr, cagr_percentage = calculate_cagr(
-                                trade_price, spread, days
-                            )
-                        else:
-                            cagr, cagr_percentage = calculate_cagr(
-                                spread, trade_price, days
-                            )
-                        # print(f"Trade Price: {trade_price}, CAGR: {cagr}, CAGR Percentage: {cagr_percentage}")
-                        if trade.lower() == "buy" and (
-                            highest_cagr is None or cagr > highest_cagr
-                        ):
-                            best_spread = {
-                                "date": entry[0]["date"],
-                                "strike1": low_strike,
-                                "strike2": high_strike,
-                                "net_debit": round(trade_price, 2),
-                                "cagr": round(cagr, 2),
-                                "cagr_percentage": round(cagr_percentage, 2),
-                                "total_investment": round(trade_price * 100, 2),
-                                "total_return": round((spread) * 100, 2),
-                            }
-                            highest_cagr = round(cagr, 2)
-                        elif trade.lower() == "sell" and (
-                            highest_cagr is None or cagr > highest_cagr
-                        ):
-                            best_spread = {
-                                "date": entry[0]["date"],
-                                "strike1": low_strike,
-                                "strike2": high_strike,
-                                "low_call_bid": call_contracts[i]["bid"],
-                                "high_put_bid": put_contracts[j]["bid"],
-                                "high_call_ask": call_contracts[j]["ask"],
-                                "low_put_ask": put_contracts[i]["ask"],
-                                "low_call_ask": call_contracts[i]["ask"],
-                                "high_call_bid": call_contracts[j]["bid"],
-                                "low_put_bid": put_contracts[i]["bid"],
-                                "high_put_ask": put_contracts[j]["ask"],
-                                "net_debit": round(trade_price, 2),
-                                "cagr": round(cagr, 2),
-                                "cagr_percentage": round(cagr_percentage, 2),
-                                "total_investment": round(spread * 100, 2),
-                                "total_return": round((trade_price) * 100, 2),
-                            }
-                            highest_cagr = round(cagr, 2)
+            # Calculate net credit received by buying and selling options
+            if use_mid:
+                # we need the median of the bid and ask prices for put and call options
+                low_call = call_mids[i]
+                low_put = put_mids[i]
+                high_call = call_mids[j]
+                high_put = put_mids[j]
+            else:  # assuming 'natural' price
+                if trade_type == "buy":
+                    low_call = call_contracts[i]["ask"]
+                    low_put = put_contracts[i]["bid"]
+                    high_call = call_contracts[j]["bid"]
+                    high_put = put_contracts[j]["ask"]
+                elif trade_type == "sell":
+                    low_call = call_contracts[i]["bid"]
+                    low_put = put_contracts[i]["ask"]
+                    high_call = call_contracts[j]["ask"]
+                    high_put = put_contracts[j]["bid"]
+            if None not in [low_call, high_put, high_call, low_put]:
+                # print(f"Low Call: {low_call}, Low Put: {low_put}, High Call: {high_call}, High Put: {high_put}")
+                if trade_type == "buy":  # debit
+                    trade_price = low_put + high_call - high_put - low_call
+                    trade_price = -trade_price
+                elif trade_type == "sell":  # credit
+                    trade_price = low_call + high_put - high_call - low_put
+            else:
+                continue
+            # print(f"Trade Price: {trade_price}. Strike 1: {call_contracts[i]['strike']}, Strike 2: {call_contracts[j]['strike']}, date: {entry[0]['date']}")
+            low_strike = call_contracts[i]["strike"]
+            high_strike = call_contracts[j]["strike"]
+
+            if days > 1 and trade_price > 0:
+                if trade_type == "buy":
+                    cagr, cagr_percentage = calculate_cagr(trade_price, spread, days)
+                else:
+                    cagr, cagr_percentage = calculate_cagr(spread, trade_price, days)
+                # print(f"Trade Price: {trade_price}, CAGR: {cagr}, CAGR Percentage: {cagr_percentage}")
+                if trade_type == "buy" and (
+                    highest_cagr is None or cagr > highest_cagr
+                ):
+                    best_spread = {
+                        "date": entry[0]["date"],
+                        "strike1": low_strike,
+                        "strike2": high_strike,
+                        "net_debit": round(trade_price, 2),
+                        "cagr": round(cagr, 2),
+                        "cagr_percentage": round(cagr_percentage, 2),
+                        "total_investment": round(trade_price * 100, 2),
+                        "total_return": round((spread) * 100, 2),
+                    }
+                    highest_cagr = round(cagr, 2)
+                elif trade_type == "sell" and (
+                    highest_cagr is None or cagr > highest_cagr
+                ):
+                    best_spread = {
+                        "date": entry[0]["date"],
+                        "strike1": low_strike,
+                        "strike2": high_strike,
+                        "low_call_bid": call_contracts[i]["bid"],
+                        "high_put_bid": put_contracts[j]["bid"],
+                        "high_call_ask": call_contracts[j]["ask"],
+                        "low_put_ask": put_contracts[i]["ask"],
+                        "low_call_ask": call_contracts[i]["ask"],
+                        "high_call_bid": call_contracts[j]["bid"],
+                        "low_put_bid": put_contracts[i]["bid"],
+                        "high_put_ask": put_contracts[j]["ask"],
+                        "net_debit": round(trade_price, 2),
+                        "cagr": round(cagr, 2),
+                        "cagr_percentage": round(cagr_percentage, 2),
+                        "total_investment": round(spread * 100, 2),
+                        "total_return": round((trade_price) * 100, 2),
+                    }
+                    highest_cagr = round(cagr, 2)
     if best_spread is not None:
         return best_spread
     else:
@@ -223,7 +255,13 @@ def calculate_box_spread(spread, calls, puts, trade="Sell", price="natural"):
 
 
 def bull_call_spread(
-    api, asset, spread=100, days=90, downsideProtection=0.25, price="mid"
+    api,
+    asset,
+    spread=100,
+    days=90,
+    downsideProtection=0.25,
+    price="mid",
+    quote=None,
 ):
     """
     This function calculates the best bull call spread for a given asset
@@ -233,12 +271,15 @@ def bull_call_spread(
     :param days: the number of days to expiration
     :param downsideProtection: the minimum downside protection required
     :param price: the price to be used for the spread calculation; we can use Natural (which will use the bid/ask prices) or Market/mid (which will use the median price)
+    :param quote: quotes already fetched for the asset, fetched here when not given
     :return: the best spread for the given asset
     """
 
-    toDate = datetime.today() + timedelta(days=days)
+    now = datetime.today()
+    toDate = now + timedelta(days=days)
     optionChain = OptionChain(api, asset, toDate, days)
-    quote = api.get_quote(asset)
+    if quote is None:
+        quote = api.get_quote(asset)
     if quote is not None and asset in quote:
         asset_quote = quote[asset]
         if asset_quote is not None and "quote" in asset_quote:
@@ -248,86 +289,68 @@ def bull_call_spread(
         return None
     chain = optionChain.get()
 
-    entries = sorted(
-        chain,
-        key=lambda entry: (
-            datetime.strptime(entry["date"], "%Y-%m-%d"),
-            -max(
-                contract["strike"]
-                for contract in entry["contracts"]
-                if "strike" in contract
-            ),
-        ),
-    )
+    entries = sort_chain(chain)
 
-    best_spread = None
+    best = None
     highest_cagr = float("-inf")
+    use_mid = price.lower() in ["mid", "market"]
     # Iterate over each date's options
     for entry in entries:
         contracts = sorted(entry["contracts"], key=lambda c: c["strike"])
-        for i in range(len(contracts)):
-            # Find the next contract with a strike that is 'spread' above this one
-            for j in range(i + 1, len(contracts)):
-                if contracts[j]["strike"] - contracts[i]["strike"] == spread:
-                    # Calculate net credit received by buying and selling options
-                    #
-                    if price.lower() in ["mid", "market"]:
-                        net_debit = statistics.median(
-                            [contracts[i]["bid"], contracts[i]["ask"]]
-                        ) - statistics.median(
-                            [contracts[j]["bid"], contracts[j]["ask"]]
-                        )
-                    else:
-                        net_debit = contracts[i]["ask"] - contracts[j]["bid"]
-                    # calculate break even for this spread
-                    break_even = contracts[i]["strike"] + net_debit
-                    downside_protection = 1 - (break_even / underlying_price)
-                    # Calculate CAGR for this spread
-                    days = (
-                        datetime.strptime(entry["date"], "%Y-%m-%d") - datetime.today()
-                    ).days
-                    if (
-                        days > 1
-                        and net_debit > 0
-                        and net_debit < spread
-                        and downside_protection > downsideProtection
-                    ):
-                        total_investment = net_debit
-                        returns = abs(contracts[j]["strike"] - contracts[i]["strike"])
-                        cagr, cagr_percentage = calculate_cagr(
-                            total_investment, returns, days
-                        )
-                    else:
-                        cagr = float("-inf")
-                        cagr_percentage = round(cagr, 2)
-
-                    # If this spread has a higher CAGR than the previous best, update our best spread
-                    if cagr > highest_cagr:
-                        best_spread = {
-                            "asset": asset,
-                            "date": entry["date"],
-                            "strike1": contracts[i]["strike"],
-                            "bid1": contracts[i]["bid"],
-                            "ask1": contracts[i]["ask"],
-                            "bid2": contracts[j]["bid"],
-                            "ask2": contracts[j]["ask"],
-                            "strike2": contracts[j]["strike"],
-                            "net_debit": round(net_debit, 2),
-                            "cagr": round(cagr, 2),
-                            "cagr_percentage": round(cagr_percentage, 2),
-                            "downside_protection": round(downside_protection * 100, 2),
-                            "total_investment": round(net_debit * 100, 2),
-                            "total_return": round((spread - net_debit) * 100, 2),
-                        }
-                        highest_cagr = round(cagr, 2)
-    if best_spread is not None:
-        return best_spread
-    else:
+        days = (parse_date(entry["date"]) - now).days
+        strikes = [contract["strike"] for contract in contracts]
+        if use_mid:
+            mids = mid_prices(contracts)
+        for i, j in spread_pairs(strikes, spread):
+            # Calculate net credit received by buying and selling options
+            #
+            if use_mid:
+                net_debit = mids[i] - mids[j]
+            else:
+                net_debit = contracts[i]["ask"] - contracts[j]["bid"]
+            # calculate break even for this spread
+            break_even = contracts[i]["strike"] + net_debit
+            downside_protection = 1 - (break_even / underlying_price)
+            # Calculate CAGR for this spread
+            if (
+                days > 1
+                and net_debit > 0
+                and net_debit < spread
+                and downside_protection > downsideProtection
+            ):
+                total_investment = net_debit
+                returns = abs(contracts[j]["strike"] - contracts[i]["strike"])
+                cagr, cagr_percentage = calculate_cagr(total_investment, returns, days)
+            else:
+                cagr = float("-inf")
+                cagr_percentage = round(cagr, 2)
+
+            # If this spread has a higher CAGR than the previous best, update our best spread
+            if cagr > highest_cagr:
+                best = (
+                    entry["date"],
+                    contracts[i],
+                    contracts[j],
+                    net_debit,
+                    cagr,
+                    cagr_percentage,
+                    downside_protection,
+                )
+                highest_cagr = round(cagr, 2)
+    if best is None:
         return None
 
+    return spread_result(asset, spread, best)
+
 
 def synthetic_covered_call_spread(
-    api, asset, spread=100, days=90, downsideProtection=0.25, price="mid"
+    api,
+    asset,
+    spread=100,
+    days=90,
+    downsideProtection=0.25,
+    price="mid",
+    quote=None,
 ):
     """
     This function calculates the best bull call spread for a given asset
@@ -337,13 +360,16 @@ def synthetic_covered_call_spread(
     :param days: the number of days to expiration
     :param downsideProtection: the minimum downside protection required
     :param price: the price to be used for the spread calculation; we can use Natural (which will use the bid/ask prices) or Market/mid (which will use the median price)
+    :param quote: quotes already fetched for the asset, fetched here when not given
     :return: the best spread for the given asset
     """
 
-    toDate = datetime.today() + timedelta(days=days)
+    now = datetime.today()
+    toDate = now + timedelta(days=days)
     optionChain = OptionChain(api, asset, toDate, days)
     puts = api.getPutOptionChain(asset, strikes=150, date=toDate, daysLessAllowed=days)
-    quote = api.get_quote(asset)
+    if quote is None:
+        quote = api.get_quote(asset)
     if quote is not None and asset in quote:
         asset_quote = quote[asset]
         if asset_quote is not None and "quote" in asset_quote:
@@ -354,124 +380,83 @@ def synthetic_covered_call_spread(
     chain = optionChain.get()
     puts = optionChain.mapApiData(puts, put=True)
 
-    entries = sorted(
-        chain,
-        key=lambda entry: (
-            datetime.strptime(entry["date"], "%Y-%m-%d"),
-            -max(
-                contract["strike"]
-                for contract in entry["contracts"]
-                if "strike" in contract
-            ),
-        ),
-    )
-
-    puts = sorted(
-        puts,
-        key=lambda entry: (
-            datetime.strptime(entry["date"], "%Y-%m-%d"),
-            -max(
-                contract["strike"]
-                for contract in entry["contracts"]
-                if "strike" in contract
-            ),
-        ),
-    )
-    best_spread = None
+    entries = sort_chain(chain)
+    puts = sort_chain(puts)
+    best = None
     highest_cagr = float("-inf")
+    use_mid = price.lower() in ["mid", "market"]
     # Iterate over each date's options
     for entry in zip(entries, puts):
         contracts = sorted(entry[0]["contracts"], key=lambda c: c["strike"])
         put_contracts = sorted(entry[1]["contracts"], key=lambda c: c["strike"])
-
-        for i in range(len(contracts)):
-            # Find the next contract with a strike that is 'spread' above this one
-            for j in range(i + 1, len(contracts)):
-                if contracts[j]["strike"] - contracts[i]["strike"] == spread:
-                    # Calculate net credit received by buying and selling options
-                    #
-                    if price.lower() in ["mid", "market"]:
-                        net_debit = (
-                            statistics.median(
-                                [contracts[i]["bid"], contracts[i]["ask"]]
-                            )
-                            - statistics.median(
-                                [contracts[j]["bid"], contracts[j]["ask"]]
-                            )
-                            - statistics.median(
-                                [put_contracts[i]["bid"], put_contracts[i]["ask"]]
-                            )
-                        )
-                    else:
-                        net_debit = (
-                            contracts[i]["ask"]
-                            - contracts[j]["bid"]
-                            - put_contracts[i]["bid"]
-                        )
-                    # calculate break even for this spread
-                    break_even = contracts[i]["strike"] + net_debit
-                    downside_protection = 1 - (break_even / underlying_price)
-                    # Calculate CAGR for this spread
-                    days = (
-                        datetime.strptime(entry[0]["date"], "%Y-%m-%d")
-                        - datetime.today()
-                    ).days
-                    if (
-                        days > 1
-                        and net_debit > 0
-                        and net_debit < spread
-                        and downside_protection > downsideProtection
-                    ):
-                        total_investment = net_debit
-                        returns = abs(contracts[j]["strike"] - contracts[i]["strike"])
-                        cagr, cagr_percentage = calculate_cagr(
-                            total_investment, returns, days
-                        )
-                    else:
-                        cagr = float("-inf")
-                        cagr_percentage = round(cagr, 2)
-
-                    # If this spread has a higher CAGR than the previous best, update our best spread
-                    if cagr > highest_cagr:
-                        best_spread = {
-                            "asset": asset,
-                            "date": entry[0]["date"],
-                            "strike1": contracts[i]["strike"],
-                            "bid1": contracts[i]["bid"],
-                            "ask1": contracts[i]["ask"],
-                            "bid2": contracts[j]["bid"],
-                            "ask2": contracts[j]["ask"],
-                            "strike2": contracts[j]["strike"],
-                            "net_debit": round(net_debit, 2),
-                            "cagr": round(cagr, 2),
-                            "cagr_percentage": round(cagr_percentage, 2),
-                            "downside_protection": round(downside_protection * 100, 2),
-                            "total_investment": round(net_debit * 100, 2),
-                            "total_return": round((spread - net_debit) * 100, 2),
-                        }
-                        highest_cagr = round(cagr, 2)
-    if best_spread is not None:
-        return best_spread
-    else:
+        days = (parse_date(entry[0]["date"]) - now).days
+
+        strikes = [contract["strike"] for contract in contracts]
+        if use_mid:
+            mids = mid_prices(contracts)
+            put_mids = mid_prices(put_contracts)
+        for i, j in spread_pairs(strikes, spread):
+            # Calculate net credit received by buying and selling options
+            #
+            if use_mid:
+                net_debit = mids[i] - mids[j] - put_mids[i]
+            else:
+                net_debit = (
+                    contracts[i]["ask"] - contracts[j]["bid"] - put_contracts[i]["bid"]
+                )
+            # calculate break even for this spread
+            break_even = contracts[i]["strike"] + net_debit
+            downside_protection = 1 - (break_even / underlying_price)
+            # Calculate CAGR for this spread
+            if (
+                days > 1
+                and net_debit > 0
+                and net_debit < spread
+                and downside_protection > downsideProtection
+            ):
+                total_investment = net_debit
+                returns = abs(contracts[j]["strike"] - contracts[i]["strike"])
+                cagr, cagr_percentage = calculate_cagr(total_investment, returns, days)
+            else:
+                cagr = float("-inf")
+                cagr_percentage = round(cagr, 2)
+
+            # If this spread has a higher CAGR than the previous best, update our best spread
+            if cagr > highest_cagr:
+                best = (
+                    entry[0]["date"],
+                    contracts[i],
+                    contracts[j],
+                    net_debit,
+                    cagr,
+                    cagr_percentage,
+                    downside_protection,
+                )
+                highest_cagr = round(cagr, 2)
+    if best is None:
         return None
 
+    return spread_result(asset, spread, best)
+
 
 def calculate_spread(
-    api, asset, spread, days, downsideProtection, price_method, synthetic
+    api, asset, spread, days, downsideProtection, price_method, synthetic, quote=None
 ):
     if synthetic:
         return asset, synthetic_covered_call_spread(
-            api, asset, spread, days, downsideProtection, price_method
+            api, asset, spread, days, downsideProtection, price_method, quote
         )
     else:
         return asset, bull_call_spread(
-            api, asset, spread, days, downsideProtection, price_method
+            api, asset, spread, days, downsideProtection, price_method, quote
         )
 
 
 def find_spreads(api, synthetic=False):
     spread_dict = {}
     futures_to_asset = {}
+    # quote every asset in one request instead of one request per asset
+    quotes = api.get_quotes(list(spreads))
 
     with ThreadPoolExecutor() as executor:
         for asset in spreads:
@@ -488,6 +473,7 @@ def find_spreads(api, synthetic=False):
                 downsideProtection,
                 price_method,
                 synthetic,
+                quotes,
             )
             futures_to_asset[future] = asset
 
@@ -577,7 +563,7 @@ def find_spreads(api, synthetic=False):
         except TimeoutOccurred:
             user_input = "no"
         if user_input == "yes":
-            selected_date = datetime.strptime(selected_date, "%Y-%m-%d")
+            selected_date = parse_date(selected_date)
             if synthetic:
                 api.place_order(
                     api.synthetic_covered_call_order,
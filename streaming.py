@@ -1,7 +1,8 @@
-import time
 import asyncio
 import logging
 import pprint
+import random
+import threading
 from datetime import datetime, timedelta
 from typing import Callable, Optional
 from typing import List, Dict
@@ -10,6 +11,7 @@ from configuration import apiKey, apiRedirectUri, appSecret
 import schwab
 from schwab.client import AsyncClient
 from schwab.streaming import StreamClient
+from websockets.exceptions import ConnectionClosed
 
 API_KEY = apiKey
 CLIENT_SECRET = appSecret
@@ -22,10 +24,20 @@ async def get_chains(client: AsyncClient, instruments: List[str]) -> Dict:
     from_date = datetime.today().date()
     to_date = from_date + timedelta(days=3)
 
-    for instrument in instruments:
-        chain = client.get_option_chain(
-            instrument, from_date=from_date, to_date=to_date
+    # the client blocks, run the requests side by side instead of one after another
+    responses = await asyncio.gather(
+        *(
+            asyncio.to_thread(
+                client.get_option_chain,
+                instrument,
+                from_date=from_date,
+                to_date=to_date,
+            )
+            for instrument in instruments
         )
+    )
+
+    for instrument, chain in zip(instruments, responses):
         if chain.status_code == 200:
             chains[instrument] = chain.json()
 
@@ -70,6 +82,11 @@ def get_contracts_from_chains(chains: Dict) -> Dict:
 
 
 class OptionsDataStream:
+    # give up on the stream after this many messages in a row failed
+    max_consecutive_errors = 10
+    # option symbols sent per subscription request
+    subscription_chunk_size = 250
+
     def __init__(
         self,
         instruments: List[str],
@@ -98,6 +115,7 @@ class OptionsDataStream:
         self.instruments = instruments
         self.process_context = process_context
         self.on_success = on_success
+        self.queue_task = None
 
         # Create a queue, so we can queue up work gathered from the client
         self.queue = asyncio.Queue(queue_size)
@@ -153,23 +171,50 @@ class OptionsDataStream:
 
         contracts = get_contracts_names(contracts)
 
-        await self.stream_client.level_one_option_subs(contracts)
+        await self.subscribe(contracts)
 
         # Initiate something after everything works (send news)
         if self.on_success:
             await self.on_success()
 
-        # Kick off our handle_queue function as an independent coroutine
-        asyncio.ensure_future(self.handle_queue())
+        # Kick off our handle_queue function as an independent coroutine, keeping
+        # a reference so it isn't garbage collected and starts only once
+        if self.queue_task is None:
+            self.queue_task = asyncio.create_task(self.handle_queue())
 
-        # Continuously handle inbound messages
+        # Continuously handle inbound messages, skipping over the odd bad one
+        errors = 0
         while True:
             try:
                 await self.stream_client.handle_message()
-            except:
+                errors = 0
+            except ConnectionClosed:
+                # every further read fails the same way, don't spin on it
+                raise
+            except Exception:
                 logging.exception("error occurred")
+                errors += 1
+                if errors >= self.max_consecutive_errors:
+                    raise
+
+    async def subscribe(self, contracts: List[str]):
+        """
+        A whole chain is thousands of contracts, asking for them in a single
+        frame holds up the first quotes until the server went through all of
+        them. SUBS replaces the subscription, so only the first chunk uses it
+        and the rest are added on top. The stream client takes one request at
+        a time anyway, so the chunks are sent one after another.
+        """
+        size = self.subscription_chunk_size
+        chunks = [contracts[i : i + size] for i in range(0, len(contracts), size)]
+        if not chunks:
+            return
+
+        await self.stream_client.level_one_option_subs(chunks[0])
+        for chunk in chunks[1:]:
+            await self.stream_client.level_one_option_add(chunk)
 
-    async def handle_level_one_option(self, msg):
+    def handle_level_one_option(self, msg):
         """
         This is where we take msgs from the streaming client and put them on a
         queue for later consumption. We use a queue to prevent us from wasting
@@ -178,10 +223,12 @@ class OptionsDataStream:
         # if the queue is full, make room
         if self.queue.full():  # This won't happen if the queue doesn't have a max size
             logging.warning(
-                "Handler queue is full. Awaiting to make room... Some messages might be dropped"
+                "Handler queue is full. Dropping the oldest message to make room"
             )
-            await self.queue.get()
-        await self.queue.put(msg)
+            self.queue.get_nowait()
+        # nothing here has to wait; as a plain function the stream client calls
+        # it directly instead of scheduling a task for every message
+        self.queue.put_nowait(msg)
 
     async def handle_queue(self):
         """
@@ -192,9 +239,124 @@ class OptionsDataStream:
             await self.process_context(msg)
 
 
+class AccountActivityStream:
+    # seconds before reconnecting a dropped stream, doubled on every failure
+    reconnect_delay = 1
+    max_reconnect_delay = 60
+    # each wait is randomly stretched or shrunk by up to this fraction
+    reconnect_jitter = 0.2
+
+    def __init__(self, schwab_client, on_activity: Optional[Callable] = None):
+        """
+        Listens to the ACCT_ACTIVITY service on a background thread, so code
+        waiting for an order fill can wake up as soon as something happens
+        on the account instead of sleeping through its whole polling interval.
+        on_activity is called from the stream thread before waiters wake up.
+        """
+        self.schwab_client = schwab_client
+        self.on_activity = on_activity
+        self.stream_client = None
+        self.thread = None
+        self.running = False
+        # counts the messages, so a waiter knows if any came since it last woke
+        self.activity = threading.Condition()
+        self.activity_count = 0
+        self.seen_count = 0
+
+    def set_client(self, schwab_client):
+        """
+        Log in with schwab_client from the next (re)connect on; a connected
+        stream keeps working until it drops.
+        """
+        self.schwab_client = schwab_client
+
+    def start(self):
+        if self.thread is not None:
+            return
+
+        self.thread = threading.Thread(
+            target=asyncio.run,
+            args=(self.stream(),),
+            name="AccountActivityStream",
+            daemon=True,
+        )
+        self.thread.start()
+
+    async def connect(self):
+        logging.info("AccountActivityStream:: logging in")
+
+        self.stream_client = StreamClient(self.schwab_client)
+        self.stream_client.add_account_activity_handler(self.handle_account_activity)
+
+        await self.stream_client.login()
+        await self.stream_client.account_activity_sub()
+
+        # anything could have happened while we were not listening
+        if self.on_activity:
+            self.on_activity()
+        self.running = True
+
+    async def stream(self):
+        delay = self.reconnect_delay
+
+        while True:
+            try:
+                await self.connect()
+                delay = self.reconnect_delay
+
+                while True:
+                    await self.stream_client.handle_message()
+            except Exception:
+                logging.exception("AccountActivityStream:: stream stopped")
+            finally:
+                # waiters fall back to plain polling until we are back
+                self.running = False
+
+            # spread the retries out, so clients dropped by the same outage
+            # don't all reconnect at the same moment
+            wait = delay * random.uniform(
+                1 - self.reconnect_jitter, 1 + self.reconnect_jitter
+            )
+            logging.info("AccountActivityStream:: reconnecting in %.1f seconds", wait)
+            await asyncio.sleep(wait)
+            delay = min(delay * 2, self.max_reconnect_delay)
+
+    def handle_account_activity(self, msg):
+        # a subscription confirmation doesn't change any order, don't drop the
+        # order cache or wake every waiter for it
+        if all(
+            content.get("MESSAGE_TYPE") == "SUBSCRIBED"
+            for content in msg.get("content", ())
+        ):
+            return
+
+        if self.on_activity:
+            self.on_activity()
+        with self.activity:
+            self.activity_count += 1
+            self.activity.notify_all()
+
+    def wait(self, timeout):
+        """
+        Block until there is activity on the account or timeout seconds passed.
+        Returns True if woken up by activity. Activity since the last wait
+        returned wakes us up right away, so nothing that came while the caller
+        was checking its order is slept through. Waiting even while the stream
+        is still logging in means its first message wakes us up.
+        """
+        with self.activity:
+            woken = self.activity.wait_for(
+                lambda: self.activity_count != self.seen_count, timeout
+            )
+            self.seen_count = self.activity_count
+        return woken
+
+
 async def process_msg(msg: Dict):
     pprint.pprint(msg)
-    time.sleep(1)
+    # sleeping without blocking keeps the event loop reading the socket and
+    # queueing messages while this one is processed
+    await asyncio.sleep(1)
 
 
 async def main():
@@ -207,6 +369,8 @@ async def main():
         api_key=API_KEY,
         client_secret=CLIENT_SECRET,
         callback_url=CALLBACK_URL,
+        # keep only the latest messages when processing falls behind
+        queue_size=100,
     )
 
     await data_stream.initialize()
@@ -214,4 +378,4 @@ async def main():
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    asyncio.run(main())
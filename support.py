@@ -2,6 +2,7 @@ import datetime
 import re
 from dateutil.relativedelta import relativedelta
 import calendar
+from functools import lru_cache
 
 ccExpDaysOffset = 0
 defaultWaitTime = 1799
@@ -10,6 +11,8 @@ DATE_PATTERN = re.compile(r"\d{2}/\d{2}/\d{4}")
 STRIKE_PRICE_PATTERN = re.compile(r"\$\d+")
 
 
+# position descriptions repeat on every pass of the main loop
+@lru_cache(maxsize=4096)
 def extract_date(s: str) -> str:
     """Extract date from string in MM/DD/YYYY format."""
     match = DATE_PATTERN.search(s)
@@ -21,6 +24,8 @@ def extract_date(s: str) -> str:
         return None
 
 
+# every chain repeats the same few expirations, parse each one only once
+@lru_cache(maxsize=1024)
 def validDateFormat(date: str) -> bool:
     """Validate date format as YYYY-MM-DD."""
     try:
@@ -30,6 +35,14 @@ def validDateFormat(date: str) -> bool:
         return False
 
 
+# chains repeat the same expirations in every scan and spread worker
+@lru_cache(maxsize=1024)
+def parse_date(date: str) -> datetime.datetime:
+    """Parse a date in YYYY-MM-DD format."""
+    return datetime.datetime.strptime(date, "%Y-%m-%d")
+
+
+@lru_cache(maxsize=4096)
 def extract_strike_price(s: str) -> str:
     """Extract strike price from string in $XXX format."""
     match = STRIKE_PRICE_PATTERN.search(s)
@@ -0,0 +1,239 @@
+import threading
+import unittest
+from collections import OrderedDict
+from unittest.mock import MagicMock, patch
+
+import api
+from cc import price_ladder
+
+
+class MockResponse:
+    def __init__(self, data, status_code=200, headers=None):
+        self.data = data
+        self.status_code = status_code
+        self.is_error = status_code >= 400
+        self.headers = headers or {}
+
+    def json(self):
+        return self.data
+
+
+def order_response(orderId):
+    # what place_order and replace_order answer with, the new id in Location
+    return MockResponse(
+        None,
+        201,
+        {
+            "Location": "https://api.schwabapi.com/trader/v1/accounts/hash/orders/"
+            + str(orderId)
+        },
+    )
+
+
+class MockConnectClient:
+    def __init__(self, statuses):
+        # get_order answers with these statuses in turn
+        self.statuses = list(statuses)
+        self.orderRequests = []
+
+    def place_order(self, accountHash, order):
+        self.placed = order
+        return order_response(100)
+
+    def replace_order(self, accountHash, orderId, order):
+        self.replaced = (orderId, order.build())
+        return order_response(orderId + 1)
+
+    def get_order(self, orderId, accountHash):
+        self.orderRequests.append(orderId)
+        return MockResponse(
+            {
+                "status": self.statuses.pop(0),
+                "price": 1.0,
+                "filledQuantity": 0,
+                "orderType": "NET_CREDIT",
+            }
+        )
+
+
+def make_api(connectClient):
+    apiObj = api.Api("123", "456", "789")
+    apiObj.connectClient = connectClient
+    apiObj.accountHash = "hash"
+    return apiObj
+
+
+class ClearingOrderCache(OrderedDict):
+    # clears the cache from another thread right after an order is stored,
+    # the way the activity stream does when something happens on the account
+    def __init__(self, apiObj):
+        super().__init__()
+        self.apiObj = apiObj
+        self.clearer = None
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        if self.clearer is None:
+            self.clearer = threading.Thread(target=self.apiObj.clearOrderCache)
+            self.clearer.start()
+            # give it the chance to get in before the rest of the update
+            self.clearer.join(0.1)
+
+
+class OrderCacheTestCase(unittest.TestCase):
+    def test_clear_during_an_update(self):
+        apiObj = make_api(MockConnectClient(["WORKING"]))
+        apiObj.orderCache = ClearingOrderCache(apiObj)
+
+        checkedOrder = apiObj.fetchOrder(1)
+        apiObj.orderCache.clearer.join()
+
+        self.assertEqual(checkedOrder["status"], "WORKING")
+        self.assertEqual(len(apiObj.orderCache), 0)
+
+    def test_terminal_orders_leave_the_cache(self):
+        apiObj = make_api(MockConnectClient(["WORKING", "FILLED"]))
+        apiObj.sentOrders[1] = object()
+
+        apiObj.fetchOrder(1)
+        self.assertIn(1, apiObj.orderCache)
+
+        apiObj.fetchOrder(1)
+        self.assertNotIn(1, apiObj.orderCache)
+        self.assertNotIn(1, apiObj.sentOrders)
+        self.assertEqual(apiObj.checkOrder(1)["status"], "FILLED")
+        self.assertEqual(apiObj.connectClient.orderRequests, [1, 1])
+
+    def test_oldest_checked_order_is_dropped(self):
+        apiObj = make_api(MockConnectClient(["WORKING"] * 4))
+        apiObj.orderCacheSize = 2
+
+        for orderId in [1, 2, 1, 3]:
+            apiObj.fetchOrder(orderId)
+
+        self.assertEqual(list(apiObj.orderCache), [1, 3])
+
+
+class RepriceTestCase(unittest.TestCase):
+    def setUp(self):
+        sending = patch("api.debugCanSendOrders", True)
+        sending.start()
+        self.addCleanup(sending.stop)
+
+        self.apiObj = make_api(MockConnectClient(["WORKING"]))
+        order = self.apiObj.buildMultiLegOrder(
+            [(api.OptionInstruction.SELL_TO_OPEN, "QQQ 122021C405", 1)],
+            "1.5",
+            api.OrderType.NET_CREDIT,
+        )
+        self.orderId = self.apiObj.submitOrder(order, "Error while placing")
+
+    def test_replaces_the_order_at_the_new_price(self):
+        self.apiObj.fetchOrder(self.orderId)
+
+        newOrderId = self.apiObj.editOrderPrice(self.orderId, -1.45)
+
+        replacedId, spec = self.apiObj.connectClient.replaced
+        self.assertEqual(replacedId, self.orderId)
+        self.assertEqual(spec["price"], "1.45")
+        self.assertEqual(newOrderId, self.orderId + 1)
+        # the new order takes over the spec, the old one is forgotten
+        self.assertEqual(list(self.apiObj.sentOrders), [newOrderId])
+        self.assertNotIn(self.orderId, self.apiObj.orderCache)
+
+    def test_unknown_order_fails_the_bot(self):
+        del self.apiObj.sentOrders[self.orderId]
+
+        with patch("alert.botAlert", "console"):
+            self.assertRaises(
+                SystemExit, self.apiObj.editOrderPrice, self.orderId, 1.45
+            )
+        self.assertFalse(hasattr(self.apiObj.connectClient, "replaced"))
+
+
+class FakeClock:
+    # stands in for the time module, sleeping only moves the clock on
+    def __init__(self):
+        self.now = 0
+        self.waits = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.waits.append(seconds)
+        self.now += seconds
+
+
+class MonitorOrderTestCase(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        # jitter stretches every wait by its full fraction
+        self.random = MagicMock()
+        self.random.uniform.side_effect = lambda low, high: high
+        for target, value in [("api.time", self.clock), ("api.random", self.random)]:
+            patcher = patch(target, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.apiObj = make_api(None)
+        self.apiObj.orderCheckJitter = 0
+        self.statuses = []
+        self.checked = []
+        self.edits = []
+        self.apiObj.checkOrder = self.checkOrder
+        self.apiObj.editOrderPrice = self.editOrderPrice
+
+    def checkOrder(self, orderId):
+        self.checked.append(orderId)
+        status = self.statuses.pop(0) if self.statuses else "WORKING"
+        return {"status": status, "filled": status == "FILLED"}
+
+    def editOrderPrice(self, orderId, price):
+        self.edits.append((orderId, price))
+        return orderId + 1
+
+    def test_reprices_down_the_ladder(self):
+        self.apiObj.monitorOrder(1, 2.0, 1, maxRetries=3, checkFillXTimes=2)
+
+        ladder = price_ladder(2.0, 3)
+        self.assertEqual(self.edits, [(1, ladder[0]), (2, ladder[1]), (3, ladder[2])])
+        # every price gets a 2 second window, backing off within it
+        self.assertEqual(self.clock.waits, [0.5, 1, 0.5] * 3)
+        self.assertEqual(self.checked, [1, 1, 1, 2, 2, 2, 3, 3, 3])
+
+    def test_backoff_restarts_when_the_status_changes(self):
+        self.apiObj.orderCheckJitter = 0.2
+        self.statuses = ["QUEUED", "QUEUED", "WORKING", "WORKING", "FILLED"]
+
+        self.apiObj.monitorOrder(1, 2.0, 30)
+
+        self.assertEqual(self.edits, [])
+        self.random.uniform.assert_called_with(0.8, 1.2)
+        waits = [round(wait, 6) for wait in self.clock.waits]
+        self.assertEqual(waits, [0.6, 1.2, 2.4, 0.6, 1.2])
+
+    def test_stops_on_a_terminal_status(self):
+        self.statuses = ["WORKING", "REJECTED"]
+
+        with patch("alert.alert") as alertMock:
+            self.apiObj.monitorOrder(1, 2.0, 30)
+
+        self.assertEqual(self.checked, [1, 1])
+        self.assertEqual(self.edits, [])
+        self.assertIn("Order rejected: 1", alertMock.call_args[0][1])
+
+    def test_window_follows_a_callable_interval(self):
+        # the interval drops from 30 to 1 second a second in, which shrinks
+        # the window of the current price to 2 seconds
+        def checkInterval():
+            return 30 if self.clock.now < 1 else 1
+
+        self.apiObj.monitorOrder(1, 2.0, checkInterval, maxRetries=1, checkFillXTimes=2)
+
+        self.assertEqual(self.clock.waits, [0.5, 1, 0.5])
+        self.assertEqual(self.edits, [(1, price_ladder(2.0, 1)[0])])
+
+
+if __name__ == "__main__":
+    unittest.main()
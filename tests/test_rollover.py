@@ -0,0 +1,107 @@
+import json
+import os
+import unittest
+from unittest.mock import patch
+
+import cc
+
+dataDir = os.path.join(os.path.dirname(os.path.realpath(__file__)), "data")
+
+
+def load_chain(name):
+    # the chain as optionChain.get() maps it, with OCC style symbols so the
+    # short's root matches the contracts' optionRoot
+    with open(os.path.join(dataDir, name)) as f:
+        data = json.load(f)
+
+    chain = []
+    for key, strikes in data["callExpDateMap"].items():
+        date, days = key.split(":")
+        contracts = []
+        for value in strikes.values():
+            contract = value[0]
+            contracts.append(
+                {
+                    "symbol": contract["symbol"].replace("_", " "),
+                    "strike": contract["strikePrice"],
+                    "bid": contract["bid"],
+                    "ask": contract["ask"],
+                    "delta": contract["delta"],
+                    "optionRoot": data["symbol"],
+                    "underlying": data["symbol"],
+                    "putCall": contract["putCall"],
+                }
+            )
+        chain.append({"date": date, "days": int(days), "contracts": contracts})
+
+    return chain
+
+
+class MockApi:
+    def __init__(self, underlyingPrice):
+        self.underlyingPrice = underlyingPrice
+
+    def getATMPrice(self, asset):
+        return self.underlyingPrice
+
+
+# expiring 2021-11-22 at a 402 strike and a mid of about 2.85; the 2021-12-20
+# contracts (403, 404, 405) are 28 days out and about 5.87, 5.27 and 4.69 more
+short = {
+    "stockSymbol": "QQQ",
+    "optionSymbol": "QQQ 112221C402",
+    "expiration": "2021-11-22",
+    "count": 1,
+    "strike": "402",
+}
+
+baseConfig = {
+    "ITMLimit": 1,
+    "deepITMLimit": 10,
+    "deepOTMLimit": 10,
+    "minRollOutWindow": 7,
+    "maxRollOutWindow": 30,
+}
+
+
+class FindBestRolloverTestCase(unittest.TestCase):
+    def setUp(self):
+        self.chain = load_chain("test_chain.json")
+
+    def rollover(self, underlyingPrice, option=short, **config):
+        with patch.dict(cc.configuration, {"QQQ": dict(baseConfig, **config)}):
+            return cc.find_best_rollover(MockApi(underlyingPrice), self.chain, option)
+
+    def test_otm_takes_the_strictest_criteria_met(self):
+        # only 404 is both 2 above the short and 5 more in premium, 405 is
+        # further up but would need the premium relaxed to 4.5
+        roll = self.rollover(400, minRollupGap=2, idealPremium=5, minPremium=1)
+        self.assertEqual(roll["symbol"], "QQQ 122021C404")
+
+    def test_itm_takes_the_highest_strike(self):
+        # all of them give 4.5 more, the highest strike wins
+        roll = self.rollover(405, minRollupGap=0, minPremium=4.5)
+        self.assertEqual(roll["symbol"], "QQQ 122021C405")
+
+    def test_itm_relaxes_the_premium(self):
+        # none gives 6 more, relaxing it to 5.75 finds 403 first
+        roll = self.rollover(405, minRollupGap=2, minPremium=6)
+        self.assertEqual(roll["symbol"], "QQQ 122021C403")
+
+    def test_deep_itm_takes_the_highest_strike_for_a_credit(self):
+        roll = self.rollover(412, deepITMLimit=5)
+        self.assertEqual(roll["symbol"], "QQQ 122021C405")
+
+    def test_nothing_qualifies(self):
+        # the otm criteria are never relaxed below minPremium, which none of
+        # the contracts give; relaxing used to loop forever here
+        roll = self.rollover(400, minRollupGap=0, idealPremium=6, minPremium=6)
+        self.assertIsNone(roll)
+
+    def test_short_not_in_chain(self):
+        option = dict(short, optionSymbol="QQQ 112221C999")
+        self.assertIsNone(self.rollover(400, option, minRollupGap=0, minPremium=1))
+
+
+if __name__ == "__main__":
+    unittest.main()
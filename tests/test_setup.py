@@ -0,0 +1,44 @@
+import unittest
+
+import httpx
+
+import api
+
+
+class MockResponse:
+    def __init__(self, status_code):
+        self.status_code = status_code
+
+
+class MockConnectClient:
+    def get_account_numbers(self):
+        raise AssertionError("setup shouldn't ask the api to reuse a client")
+
+
+def status_error(status_code):
+    return httpx.HTTPStatusError(
+        "error", request=None, response=MockResponse(status_code)
+    )
+
+
+class SetupTestCase(unittest.TestCase):
+    def setUp(self):
+        self.apiObj = api.Api("123", "456", "789")
+        self.client = self.apiObj.connectClient = MockConnectClient()
+
+    def test_reuses_the_client_without_a_request(self):
+        self.apiObj.setup()
+        self.assertIs(self.apiObj.connectClient, self.client)
+
+    def test_drops_the_client_on_an_auth_error(self):
+        self.assertTrue(self.apiObj.dropStaleClient(status_error(401)))
+        self.assertIsNone(self.apiObj.connectClient)
+
+    def test_keeps_the_client_on_other_errors(self):
+        for e in [status_error(500), httpx.TransportError("down"), KeyError()]:
+            self.assertFalse(self.apiObj.dropStaleClient(e))
+        self.assertIs(self.apiObj.connectClient, self.client)
+
+
+if __name__ == "__main__":
+    unittest.main()
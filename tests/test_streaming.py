@@ -0,0 +1,38 @@
+import threading
+import unittest
+
+from streaming import AccountActivityStream
+
+orderMessage = {"content": [{"MESSAGE_TYPE": "OrderCreated"}]}
+
+
+class AccountActivityWaitTestCase(unittest.TestCase):
+    def setUp(self):
+        self.stream = AccountActivityStream(None)
+
+    def test_activity_between_waits_is_not_lost(self):
+        # comes in while the caller is checking its order, after the last wait
+        # returned and before the next one started
+        self.stream.handle_account_activity(orderMessage)
+
+        self.assertTrue(self.stream.wait(0))
+        self.assertFalse(self.stream.wait(0))
+
+    def test_subscription_confirmation_doesnt_wake(self):
+        self.stream.handle_account_activity(
+            {"content": [{"MESSAGE_TYPE": "SUBSCRIBED"}]}
+        )
+        self.assertFalse(self.stream.wait(0))
+
+    def test_wakes_on_activity_from_the_stream_thread(self):
+        timer = threading.Timer(
+            0.05, self.stream.handle_account_activity, (orderMessage,)
+        )
+        timer.start()
+        self.addCleanup(timer.cancel)
+
+        self.assertTrue(self.stream.wait(5))
+
+
+if __name__ == "__main__":
+    unittest.main()